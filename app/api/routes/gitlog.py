@@ -0,0 +1,45 @@
+"""Native git log conversion routes (no AI)."""
+
+from fastapi import APIRouter, HTTPException
+
+from app.core.file_manager import file_manager
+from app.core.gitlog_parser import gitlog_parser, is_git_log
+from app.api.schemas.gitlog import GitLogConvertRequest, GitLogConvertResponse
+
+router = APIRouter(prefix="/gitlog", tags=["gitlog"])
+
+
+@router.post("/convert", response_model=GitLogConvertResponse)
+async def convert_gitlog(request: GitLogConvertRequest):
+    """
+    Convert an uploaded raw git log into a work report skeleton.
+
+    Deterministic and instant; the result has the same structure as the AI
+    output and is saved as a new markdown file, replacing the original.
+    Use /api/ai/process instead for AI-written descriptions.
+    """
+    content = file_manager.get_file_content(request.file_id)
+    if not content:
+        raise HTTPException(status_code=404, detail="File not found")
+    if not is_git_log(content):
+        raise HTTPException(status_code=400, detail="File is not raw git log output")
+
+    days = gitlog_parser.group_by_day(gitlog_parser.parse(content))
+    processed_content = gitlog_parser.days_to_markdown(days)
+
+    new_file = file_manager.save_content(
+        content=processed_content,
+        filename="Work_Report.md",
+    )
+
+    # Delete original file to prevent duplicate content
+    file_manager.delete_file(request.file_id)
+
+    return GitLogConvertResponse(
+        processed_content=processed_content,
+        original_file_id=request.file_id,
+        new_file_id=new_file.file_id,
+        new_filename=new_file.original_name,
+        commits=sum(len(day_commits) for _, day_commits in days),
+        days=len(days),
+    )
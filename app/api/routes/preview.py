@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import HTMLResponse, StreamingResponse
-from io import BytesIO
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, FileResponse
+from starlette.background import BackgroundTask
 
 from app.core.markdown_parser import CombineMode
 from app.core.template_engine import ReportVariables
 from app.services.report_service import report_service
-from app.api.schemas.report import PreviewRequest
+from app.api.schemas.report import PreviewRequest, LivePreviewRequest, LivePreviewResponse
 
 router = APIRouter(prefix="/preview", tags=["preview"])
 
@@ -27,17 +28,21 @@ async def preview_html(request: PreviewRequest):
         if request.variables.start_date and request.variables.end_date:
             variables.set_date_range(
                 request.variables.start_date,
-                request.variables.end_date
+                request.variables.end_date,
+                request.variables.filter_by_date,
             )
 
         combine_mode = CombineMode(request.combine_mode.value)
 
-        html = report_service.generate_preview_html(
+        # Parsed on a worker thread; the parser pool allows parallel previews
+        html = await run_in_threadpool(
+            report_service.generate_preview_html,
             file_ids=request.file_ids,
             image_ids=request.image_ids,
             template_name=request.template_name,
             variables=variables,
             combine_mode=combine_mode,
+            section=request.section,
         )
 
         return HTMLResponse(content=html)
@@ -48,9 +53,79 @@ async def preview_html(request: PreviewRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
 
 
+@router.post("/live", response_model=LivePreviewResponse)
+async def live_preview(request: LivePreviewRequest):
+    """
+    Incremental HTML preview for editing sessions.
+
+    Send the session_id of the previous response. Only changed date
+    sections are parsed, and when the template, variables and images are
+    unchanged the response is a patch: replace or insert the elements with
+    data-section ids from "sections", arrange them by "order" and drop the
+    rest; swap in "toc" if present.
+    """
+    try:
+        variables = ReportVariables(
+            author_name=request.variables.author_name,
+            author_email=request.variables.author_email,
+            department=request.variables.department,
+            report_title=request.variables.report_title,
+            show_toc=request.variables.show_toc,
+            next_week_plan=request.variables.next_week_plan,
+        )
+
+        # Set date range if provided
+        if request.variables.start_date and request.variables.end_date:
+            variables.set_date_range(
+                request.variables.start_date,
+                request.variables.end_date,
+                request.variables.filter_by_date,
+            )
+
+        combine_mode = CombineMode(request.combine_mode.value)
+
+        preview = await run_in_threadpool(
+            report_service.generate_live_preview,
+            file_ids=request.file_ids,
+            session_id=request.session_id,
+            edited=request.contents,
+            image_ids=request.image_ids,
+            template_name=request.template_name,
+            variables=variables,
+            combine_mode=combine_mode,
+            patch=request.patch,
+        )
+
+        return LivePreviewResponse(
+            session_id=preview.session_id,
+            mode="full" if preview.full else "patch",
+            order=preview.order,
+            html=preview.html,
+            sections=preview.sections,
+            toc=preview.toc,
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
+
+
+@router.delete("/live/{session_id}")
+async def end_live_preview(session_id: str):
+    """Forget a live preview session."""
+    if not report_service.end_live_preview(session_id):
+        raise HTTPException(status_code=404, detail="Preview session not found")
+    return {"message": "Preview session ended"}
+
+
 @router.post("/pdf")
 async def preview_pdf(request: PreviewRequest):
-    """Get PDF preview (in-browser viewing)."""
+    """
+    Get PDF preview (in-browser viewing).
+
+    Set section and/or max_pages to lay out only part of the report.
+    """
     try:
         variables = ReportVariables(
             author_name=request.variables.author_name,
@@ -65,24 +140,36 @@ async def preview_pdf(request: PreviewRequest):
         if request.variables.start_date and request.variables.end_date:
             variables.set_date_range(
                 request.variables.start_date,
-                request.variables.end_date
+                request.variables.end_date,
+                request.variables.filter_by_date,
             )
 
         combine_mode = CombineMode(request.combine_mode.value)
 
-        pdf_bytes = report_service.generate_preview_pdf(
+        preview = await report_service.generate_preview_pdf(
             file_ids=request.file_ids,
             image_ids=request.image_ids,
             template_name=request.template_name,
             css_files=request.css_files,
             variables=variables,
             combine_mode=combine_mode,
+            section=request.section,
+            max_pages=request.max_pages,
         )
 
-        return StreamingResponse(
-            BytesIO(pdf_bytes),
+        # Streamed from disk in chunks with Content-Length, so memory use
+        # stays flat regardless of PDF size
+        return FileResponse(
+            path=preview.file_path,
             media_type="application/pdf",
-            headers={"Content-Disposition": "inline; filename=preview.pdf"},
+            filename="preview.pdf",
+            content_disposition_type="inline",
+            headers={"X-Render-Token": preview.render_token},
+            background=(
+                BackgroundTask(preview.file_path.unlink, missing_ok=True)
+                if preview.is_temporary
+                else None
+            ),
         )
 
     except ValueError as e:
@@ -3,39 +3,79 @@ from fastapi.responses import FileResponse
 
 from app.core.markdown_parser import CombineMode
 from app.core.template_engine import ReportVariables
-from app.services.report_service import report_service
+from app.core.pdf_cache import pdf_cache
+from app.core.parse_cache import parse_cache
+from app.core.highlight import highlight_cache
+from app.services.report_service import report_service, ReportSpec
+from app.services.job_service import job_service, JobPriority, ReportJob
 from app.api.schemas.report import (
     GenerateReportRequest,
     GeneratedReportResponse,
+    CreateJobRequest,
+    BatchReportRequest,
+    BatchReportResponse,
+    BatchItemResponse,
+    JobResponse,
+    ReportVariablesRequest,
 )
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
+def _to_variables(request: ReportVariablesRequest) -> ReportVariables:
+    """Convert request variables to domain objects."""
+    variables = ReportVariables(
+        author_name=request.author_name,
+        author_email=request.author_email,
+        department=request.department,
+        report_title=request.report_title,
+        show_toc=request.show_toc,
+        next_week_plan=request.next_week_plan,
+    )
+
+    # Set date range if provided
+    if request.start_date and request.end_date:
+        variables.set_date_range(request.start_date, request.end_date, request.filter_by_date)
+
+    return variables
+
+
+def _job_response(job: ReportJob) -> JobResponse:
+    """Convert a job to its API response."""
+    queue_seconds = None
+    run_seconds = None
+    if job.started_at:
+        queue_seconds = (job.started_at - job.created_at).total_seconds()
+        if job.finished_at:
+            run_seconds = (job.finished_at - job.started_at).total_seconds()
+
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        priority=job.priority.value,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        queue_seconds=queue_seconds,
+        run_seconds=run_seconds,
+        report_id=job.report_id,
+        filename=job.filename,
+        size=job.size,
+        duplicates_dropped=job.duplicates_dropped,
+        download_url=f"/api/reports/{job.report_id}/download" if job.report_id else None,
+        error=job.error,
+    )
+
+
 @router.post("/generate", response_model=GeneratedReportResponse)
 async def generate_report(request: GenerateReportRequest):
     """Generate a PDF report from uploaded markdown files."""
     try:
         # Convert request to domain objects
-        variables = ReportVariables(
-            author_name=request.variables.author_name,
-            author_email=request.variables.author_email,
-            department=request.variables.department,
-            report_title=request.variables.report_title,
-            show_toc=request.variables.show_toc,
-            next_week_plan=request.variables.next_week_plan,
-        )
-
-        # Set date range if provided
-        if request.variables.start_date and request.variables.end_date:
-            variables.set_date_range(
-                request.variables.start_date,
-                request.variables.end_date
-            )
-
+        variables = _to_variables(request.variables)
         combine_mode = CombineMode(request.combine_mode.value)
 
-        report = report_service.generate_report(
+        report = await report_service.generate_report(
             file_ids=request.file_ids,
             image_ids=request.image_ids,
             template_name=request.template_name,
@@ -50,6 +90,7 @@ async def generate_report(request: GenerateReportRequest):
             size=report.size,
             generated_at=report.generated_at,
             download_url=f"/api/reports/{report.report_id}/download",
+            duplicates_dropped=report.duplicates_dropped,
         )
 
     except ValueError as e:
@@ -58,6 +99,100 @@ async def generate_report(request: GenerateReportRequest):
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 
+@router.post("/batch", response_model=BatchReportResponse)
+async def generate_batch(request: BatchReportRequest):
+    """Generate many reports in parallel, e.g. one per engineer."""
+    if not request.reports:
+        raise HTTPException(status_code=400, detail="No reports provided")
+
+    try:
+        specs = [
+            ReportSpec(
+                file_ids=item.file_ids,
+                image_ids=item.image_ids,
+                template_name=item.template_name,
+                css_files=item.css_files,
+                variables=_to_variables(item.variables),
+                combine_mode=CombineMode(item.combine_mode.value),
+            )
+            for item in request.reports
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        batch = await report_service.generate_batch(specs)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate batch: {str(e)}")
+
+    return BatchReportResponse(
+        batch_id=batch.batch_id,
+        total=len(batch.manifest),
+        succeeded=batch.succeeded,
+        failed=batch.failed,
+        results=[
+            BatchItemResponse(
+                **entry,
+                download_url=(
+                    f"/api/reports/{entry['report_id']}/download"
+                    if entry["status"] == "done" else None
+                ),
+            )
+            for entry in batch.manifest
+        ],
+        download_url=f"/api/reports/batch/{batch.batch_id}/download",
+    )
+
+
+@router.get("/batch/{batch_id}/download")
+async def download_batch(batch_id: str):
+    """Download all reports of a batch as one ZIP."""
+    path = report_service.get_batch_path(batch_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return FileResponse(
+        path=path,
+        media_type="application/zip",
+        filename=f"reports_{batch_id[:8]}.zip",
+    )
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: CreateJobRequest):
+    """Queue a report for generation and return its job ID immediately."""
+    try:
+        variables = _to_variables(request.variables)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job = await job_service.submit(
+        file_ids=request.file_ids,
+        image_ids=request.image_ids,
+        template_name=request.template_name,
+        css_files=request.css_files,
+        variables=variables,
+        combine_mode=CombineMode(request.combine_mode.value),
+        priority=JobPriority(request.priority.value),
+    )
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the status of a report job."""
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Get PDF output, markdown parse and code highlight cache statistics."""
+    return {**pdf_cache.stats(), "parse": parse_cache.stats(), "highlight": highlight_cache.stats()}
+
+
 @router.get("/{report_id}/download")
 async def download_report(report_id: str):
     """Download a generated PDF report."""
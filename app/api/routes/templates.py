@@ -5,6 +5,7 @@ from app.core.pdf_generator import pdf_generator
 from app.api.schemas.template import (
     TemplateInfoResponse,
     TemplateListResponse,
+    TemplateReloadResponse,
     StyleListResponse,
 )
 
@@ -27,6 +28,12 @@ async def list_templates():
     )
 
 
+@router.post("/reload", response_model=TemplateReloadResponse)
+async def reload_templates():
+    """Load changed template files; needed when auto-reload is off (production)."""
+    return TemplateReloadResponse(templates=template_engine.reload())
+
+
 @router.get("/styles", response_model=StyleListResponse)
 async def list_styles():
     """List available CSS styles for PDF."""
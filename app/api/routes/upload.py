@@ -1,9 +1,11 @@
+from dataclasses import asdict
 from typing import List
 from fastapi import APIRouter, UploadFile, File, HTTPException
 
-from app.core.file_manager import file_manager
+from app.core.file_manager import file_manager, FileMetadata
 from app.api.schemas.upload import (
     FileMetadataResponse,
+    FileStatsResponse,
     UploadResponse,
     FileListResponse,
 )
@@ -11,6 +13,17 @@ from app.api.schemas.upload import (
 router = APIRouter(prefix="/upload", tags=["upload"])
 
 
+def _to_response(f: FileMetadata) -> FileMetadataResponse:
+    """Convert file metadata to its API response."""
+    return FileMetadataResponse(
+        file_id=f.file_id,
+        original_name=f.original_name,
+        size=f.size,
+        uploaded_at=f.uploaded_at,
+        stats=FileStatsResponse(**asdict(f.stats)) if f.stats else None,
+    )
+
+
 @router.post("", response_model=UploadResponse)
 async def upload_files(files: List[UploadFile] = File(...)):
     """Upload one or more markdown files."""
@@ -20,33 +33,17 @@ async def upload_files(files: List[UploadFile] = File(...)):
     uploaded = await file_manager.save_multiple(files)
 
     return UploadResponse(
-        files=[
-            FileMetadataResponse(
-                file_id=f.file_id,
-                original_name=f.original_name,
-                size=f.size,
-                uploaded_at=f.uploaded_at,
-            )
-            for f in uploaded
-        ],
+        files=[_to_response(f) for f in uploaded],
         message=f"Successfully uploaded {len(uploaded)} file(s)",
     )
 
 
 @router.get("", response_model=FileListResponse)
 async def list_files():
-    """List all uploaded files."""
+    """List all uploaded files with what each covers (commits, authors, dates)."""
     files = file_manager.list_files()
     return FileListResponse(
-        files=[
-            FileMetadataResponse(
-                file_id=f.file_id,
-                original_name=f.original_name,
-                size=f.size,
-                uploaded_at=f.uploaded_at,
-            )
-            for f in files
-        ],
+        files=[_to_response(f) for f in files],
         total=len(files),
     )
 
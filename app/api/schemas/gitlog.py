@@ -0,0 +1,18 @@
+"""Schemas for git log conversion endpoints."""
+
+from pydantic import BaseModel
+
+
+class GitLogConvertRequest(BaseModel):
+    """Request model for converting a raw git log."""
+    file_id: str
+
+
+class GitLogConvertResponse(BaseModel):
+    """Response model for git log conversion."""
+    processed_content: str
+    original_file_id: str
+    new_file_id: str
+    new_filename: str
+    commits: int
+    days: int
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 from enum import Enum
 
 
@@ -15,6 +15,7 @@ class ReportVariablesRequest(BaseModel):
     """Request model for report variables."""
     start_date: Optional[str] = None  # Format: YYYY-MM-DD
     end_date: Optional[str] = None    # Format: YYYY-MM-DD
+    filter_by_date: bool = False  # Only include date sections from start_date to end_date
     author_name: str = ""
     author_email: str = ""
     department: str = ""
@@ -40,6 +41,71 @@ class GeneratedReportResponse(BaseModel):
     size: int
     generated_at: datetime
     download_url: str
+    duplicates_dropped: int = 0  # Commits or date sections repeated across files, kept once
+
+
+class BatchReportRequest(BaseModel):
+    """Request model for generating many reports at once."""
+    reports: List[GenerateReportRequest]
+
+
+class BatchItemResponse(BaseModel):
+    """Result of one report in a batch."""
+    index: int
+    status: str  # "done" or "failed"
+    report_id: Optional[str] = None
+    filename: Optional[str] = None
+    size: Optional[int] = None
+    duplicates_dropped: Optional[int] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchReportResponse(BaseModel):
+    """Response model for a batch generation."""
+    batch_id: str
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResponse]
+    download_url: str  # ZIP of all generated reports plus manifest.json
+
+
+class JobPriorityEnum(str, Enum):
+    """Queue lane of a report job."""
+    interactive = "interactive"
+    bulk = "bulk"
+
+
+class JobStatusEnum(str, Enum):
+    """Lifecycle of a report job."""
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class CreateJobRequest(GenerateReportRequest):
+    """Request model for queueing a report job."""
+    priority: JobPriorityEnum = JobPriorityEnum.bulk
+
+
+class JobResponse(BaseModel):
+    """Response model for a report job."""
+    job_id: str
+    status: JobStatusEnum
+    priority: JobPriorityEnum
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    queue_seconds: Optional[float] = None  # Time spent waiting in the queue
+    run_seconds: Optional[float] = None    # Time spent generating
+    report_id: Optional[str] = None
+    filename: Optional[str] = None
+    size: Optional[int] = None
+    duplicates_dropped: Optional[int] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
 
 
 class PreviewRequest(BaseModel):
@@ -50,3 +116,28 @@ class PreviewRequest(BaseModel):
     css_files: List[str] = ["default.css"]
     variables: ReportVariablesRequest = ReportVariablesRequest()
     combine_mode: CombineModeEnum = CombineModeEnum.sequential
+    # Partial preview: only these date sections ("2025-12-23", "23 Desember 2025")
+    section: Optional[str] = None
+    max_pages: Optional[int] = Field(default=None, ge=1)  # PDF preview only
+
+
+class LivePreviewRequest(BaseModel):
+    """Request for an incremental HTML preview."""
+    session_id: Optional[str] = Field(default=None, max_length=64)  # From the previous response
+    file_ids: List[str]
+    contents: Dict[str, str] = {}  # Edited markdown by file ID, used instead of the stored file
+    image_ids: List[str] = []
+    template_name: str = "default_report.html"
+    variables: ReportVariablesRequest = ReportVariablesRequest()
+    combine_mode: CombineModeEnum = CombineModeEnum.sequential
+    patch: bool = True  # Allow a section-level patch instead of the whole document
+
+
+class LivePreviewResponse(BaseModel):
+    """Whole preview document or a patch of changed date sections."""
+    session_id: str
+    mode: str  # "full" or "patch"
+    order: List[str]  # Section ids (data-section) in document order
+    html: Optional[str] = None  # Whole document (full)
+    sections: Dict[str, str] = {}  # HTML of new or changed sections (patch)
+    toc: Optional[str] = None  # New table of contents, when it changed (patch)
@@ -14,6 +14,11 @@ class TemplateListResponse(BaseModel):
     templates: List[TemplateInfoResponse]
 
 
+class TemplateReloadResponse(BaseModel):
+    """Response model for reloading templates."""
+    templates: List[str]  # Templates loaded again
+
+
 class StyleListResponse(BaseModel):
     """Response model for listing CSS styles."""
     styles: List[str]
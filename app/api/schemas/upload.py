@@ -1,14 +1,25 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
+class FileStatsResponse(BaseModel):
+    """What an uploaded log covers."""
+    commits: int
+    authors: List[str]
+    first_date: Optional[str] = None  # Format: YYYY-MM-DD
+    last_date: Optional[str] = None   # Format: YYYY-MM-DD
+    date_sections: int
+    words: int
+
+
 class FileMetadataResponse(BaseModel):
     """Response model for file metadata."""
     file_id: str
     original_name: str
     size: int
     uploaded_at: datetime
+    stats: Optional[FileStatsResponse] = None
 
 
 class UploadResponse(BaseModel):
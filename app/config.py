@@ -24,6 +24,44 @@ class Settings(BaseSettings):
     # File upload - Images
     max_image_size: int = 5 * 1024 * 1024  # 5MB per image
     allowed_image_extensions: set = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+    image_print_max_width: int = 945  # A4 content box (160mm) at 150 DPI
+    image_print_quality: int = 85  # JPEG quality of print derivatives
+
+    # PDF rendering
+    render_workers: int = 2  # Size of the WeasyPrint render process pool
+    render_worker_max_renders: int = 200  # Recycle a worker after this many jobs (0 = never)
+    render_worker_max_rss_mb: int = 1024  # Recycle a worker above this RSS (0 = no limit)
+    render_store_max_pages: int = 500  # Laid-out pages kept for reuse per worker
+    render_store_ttl_seconds: int = 600
+    incremental_chapters: bool = True  # Render CHAPTERED reports chapter by chapter
+    chapter_cache_ttl_seconds: int = 3600
+    pdf_cache_enabled: bool = True
+    pdf_cache_max_size: int = 500 * 1024 * 1024  # 500MB
+
+    # Report templates
+    template_bytecode_cache: bool = True  # Compiled templates on disk, shared by all processes
+    template_auto_reload: bool = False  # Check template files for changes on every render (always on with debug)
+    template_reload_check_seconds: float = 5.0  # How often a process looks for a reload done by another one
+
+    # Markdown parsing
+    gitlog_auto_convert: bool = True  # Turn raw `git log` uploads into report markdown without the AI
+    dedupe_sections: bool = True  # Keep one copy of date sections and commits repeated across uploaded files
+    date_range_filter: bool = True  # Allow requests with filter_by_date to cut reports to the date sections in range
+    markdown_pool_size: int = 4  # Markdown instances for parallel parsing
+    parse_workers: int = 0  # Processes for parsing large multi-file reports (0 = one per core)
+    parallel_parse_min_size: int = 256 * 1024  # Uncached markdown below this is parsed serially
+    combine_max_memory: int = 32 * 1024 * 1024  # Markdown held in memory while combining; the rest spills to a temp file
+    parse_cache_max_size: int = 64 * 1024 * 1024  # Parsed section HTML kept in memory
+    parse_cache_disk: bool = False  # Also keep parsed sections on disk across restarts
+    parse_cache_disk_max_size: int = 200 * 1024 * 1024
+    highlight_cache_max_size: int = 8 * 1024 * 1024  # Highlighted code block HTML kept in memory
+
+    # Live HTML preview
+    preview_sessions_max: int = 100  # Live preview sessions remembered at once
+    preview_session_ttl_minutes: int = 30
+
+    # Report jobs
+    job_workers: int = 2  # The first worker only takes interactive jobs
 
     # Cleanup
     file_max_age_hours: int = 24
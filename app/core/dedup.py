@@ -0,0 +1,92 @@
+"""Dropping date sections and commits repeated across overlapping uploads."""
+
+import hashlib
+import re
+from typing import Dict, List, Optional
+
+# "**Commit:** `a1b2c3d`" in processed reports
+COMMIT_HASH_RE = re.compile(r"\*\*Commit:?\*\*:?\s*`?([0-9a-f]{7,40})\b")
+# A commit's subsection starts at a "###" heading and ends at the next heading of level 1-3
+COMMIT_HEADING_RE = re.compile(r"^###(?!#)\s")
+HEADING_RE = re.compile(r"^#{1,3}(?!#)\s")
+SEPARATOR_RE = re.compile(r"^\s*(?:---+|\*\*\*+)?\s*$")
+
+# Short hashes are what reports show; full hashes are compared on the same prefix
+HASH_CHARS = 7
+
+
+class Deduplicator:
+    """
+    Keeps the first copy of every date section and commit repeated across files.
+
+    Sections are compared by content (ignoring blank lines and trailing
+    whitespace); within a section that is new, commit subsections whose
+    hash was already seen are dropped. Only copies from an earlier file
+    count: repeats inside one file (two days with the same "no changes"
+    note) are kept. One instance covers one report; call start_file()
+    before each file.
+    """
+
+    def __init__(self):
+        self._sections: Dict[bytes, int] = {}  # Key -> file it was first seen in
+        self._commits: Dict[str, int] = {}
+        self._file = 0
+        self.dropped = 0  # Commits, or sections without commits, left out
+
+    def start_file(self):
+        """Start the sections of the next file."""
+        self._file += 1
+
+    def _section_key(self, text: str) -> bytes:
+        normalized = "\n".join(line.rstrip() for line in text.split("\n") if line.strip())
+        return hashlib.sha1(normalized.encode("utf-8")).digest()
+
+    def section(self, text: str) -> Optional[str]:
+        """
+        Deduplicate one date section (header plus body).
+
+        Returns None for a section with nothing new, the text itself when
+        nothing was dropped, or the text without its repeated commits.
+        """
+        key = self._section_key(text)
+        seen_in = self._sections.setdefault(key, self._file)
+        if seen_in != self._file:
+            self.dropped += len(set(COMMIT_HASH_RE.findall(text))) or 1
+            return None
+
+        if "Commit" not in text:
+            return text
+
+        lines = text.split("\n")
+        kept = lines[:1]
+        block: List[str] = []
+        dropped = 0
+        for line in lines[1:] + [None]:
+            if line is None or HEADING_RE.match(line):
+                if block:
+                    if self._is_new_block(block):
+                        kept.extend(block)
+                    else:
+                        dropped += 1
+                    block = []
+                if line is None:
+                    break
+                if COMMIT_HEADING_RE.match(line):
+                    block = [line]
+                    continue
+            (block if block else kept).append(line)
+
+        if not dropped:
+            return text
+        self.dropped += dropped
+        if all(SEPARATOR_RE.match(line) for line in kept[1:]):
+            return None
+        return "\n".join(kept)
+
+    def _is_new_block(self, block: List[str]) -> bool:
+        """Whether a commit subsection is not a repeat from another file; remembers its hash."""
+        for line in block:
+            match = COMMIT_HASH_RE.search(line)
+            if match:
+                return self._commits.setdefault(match.group(1)[:HASH_CHARS], self._file) == self._file
+        return True
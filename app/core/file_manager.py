@@ -1,13 +1,100 @@
+import re
 import uuid
 import json
+import itertools
 import aiofiles
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set
+from dataclasses import dataclass, field, asdict
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.core.dedup import COMMIT_HASH_RE, HASH_CHARS
+from app.core.gitlog_parser import Commit, gitlog_parser, is_git_log
+from app.core.markdown_parser import markdown_parser
+
+# Bump when the layout of the per-file index changes, so old ones are rebuilt
+INDEX_VERSION = 2
+
+# "**Author:** name" in processed reports
+AUTHOR_LINE_RE = re.compile(r"^\*\*Author:?\*\*:?[^\S\n]*(.+?)[^\S\n]*$", re.MULTILINE)
+
+
+@dataclass
+class FileStats:
+    """What an uploaded log covers, computed when it is indexed."""
+    commits: int = 0
+    authors: List[str] = field(default_factory=list)
+    first_date: Optional[str] = None  # YYYY-MM-DD
+    last_date: Optional[str] = None
+    date_sections: int = 0  # Days with a section (in the converted report for raw git logs)
+    words: int = 0
+
+
+class _IndexScan:
+    """
+    Date sections and report stats of a file, collected while its lines are read.
+
+    Sections match markdown_parser.index_sections() on the whole text, as
+    byte offsets; commits and authors are read from "**Commit:**" and
+    "**Author:**" lines.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.sections: List[List[Any]] = []  # [date, start, header end, end, has body]
+        self.commits: Set[str] = set()
+        self.authors: Set[str] = set()
+
+    def lines(self, f: BinaryIO) -> Iterator[str]:
+        """Decoded lines of a file without their newline, scanned as they are yielded."""
+        sections = self.sections
+        offset = 0
+        for raw in f:
+            line = raw.decode("utf-8")
+            if line.endswith("\n"):
+                line = line[:-1]
+            start = offset
+            offset += len(raw)
+            self.words += len(line.split())
+
+            if line.startswith("#"):
+                is_header, header_date = markdown_parser.parse_date_header(line)
+                if is_header:
+                    if sections:
+                        sections[-1][3] = start - 1
+                    sections.append([header_date, start, start + len(raw.rstrip(b"\n")), None, False])
+                    yield line
+                    continue
+            elif line.startswith("**Author"):
+                self.authors.update(AUTHOR_LINE_RE.findall(line))
+            if "Commit" in line:
+                self.commits.update(commit[:HASH_CHARS] for commit in COMMIT_HASH_RE.findall(line))
+            if sections and not sections[-1][4] and line.strip():
+                sections[-1][4] = True
+            yield line
+
+    def finish(self, size: int) -> List[List[Any]]:
+        """Sections as stored in the index: [date (YYYY-MM-DD or None), start, end]."""
+        if self.sections:
+            self.sections[-1][3] = size
+        return [
+            [day.date().isoformat() if day else None, start, end if has_body else header_end]
+            for day, start, header_end, end, has_body in self.sections
+        ]
+
+    def stats(self) -> FileStats:
+        """Stats of report markdown: commits by hash, authors, dated sections."""
+        dates = sorted(section[0] for section in self.sections if section[0] is not None)
+        return FileStats(
+            commits=len(self.commits),
+            authors=sorted(self.authors),
+            first_date=dates[0].date().isoformat() if dates else None,
+            last_date=dates[-1].date().isoformat() if dates else None,
+            date_sections=len(self.sections),
+        )
 
 
 @dataclass
@@ -18,6 +105,7 @@ class FileMetadata:
     file_path: Path
     size: int
     uploaded_at: datetime
+    stats: Optional[FileStats] = None
 
 
 class FileManager:
@@ -33,6 +121,8 @@ class FileManager:
         self.max_file_size = max_file_size
         self.allowed_extensions = allowed_extensions
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir = self.upload_dir / ".index"
+        self.index_dir.mkdir(parents=True, exist_ok=True)
 
         # Filename mapping for preserving original names
         self.mapping_file = self.upload_dir / "file_mapping.json"
@@ -94,12 +184,16 @@ class FileManager:
         self.filename_mapping[file_id] = file.filename
         self._save_mapping()
 
+        # Dates and stats in one pass over the file, off the event loop
+        file_index = await run_in_threadpool(self.build_index, file_id, file_path)
+
         return FileMetadata(
             file_id=file_id,
             original_name=file.filename,
             file_path=file_path,
             size=len(content),
             uploaded_at=datetime.now(),
+            stats=self._stats(file_index),
         )
 
     async def save_multiple(self, files: List[UploadFile]) -> List[FileMetadata]:
@@ -144,13 +238,130 @@ class FileManager:
             file_path=file_path,
             size=len(content.encode("utf-8")),
             uploaded_at=datetime.now(),
+            stats=self._stats(self.build_index(file_id, file_path)),
+        )
+
+    def _index_path(self, file_id: str) -> Path:
+        """Get the path of a file's date index."""
+        return self.index_dir / f"{file_id}.json"
+
+    def build_index(self, file_id: str, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Index the date sections of an uploaded file by byte range and persist it.
+
+        Each section is stored as [date (YYYY-MM-DD or None), start, end],
+        covering the text select_sections() would keep for it. Raw git logs
+        are only dated once converted, so their "sections" is None. The
+        file's FileStats are collected in the same pass, reading the file
+        line by line.
+        """
+        scan = _IndexScan()
+        try:
+            stat = path.stat()
+            with open(path, "rb") as f:
+                lines = scan.lines(f)
+                head = []
+                for line in lines:  # Up to the first line that tells a git log from markdown
+                    head.append(line)
+                    if line.strip():
+                        break
+                git_log = bool(head) and is_git_log(head[-1])
+                if git_log:
+                    commits = list(gitlog_parser.iter_commits(itertools.chain(head, lines)))
+                else:
+                    for _ in lines:
+                        pass
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        sections = scan.finish(stat.st_size)
+        stats = self._gitlog_stats(commits) if git_log else scan.stats()
+        stats.words = scan.words
+
+        file_index = {
+            "version": INDEX_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sections": None if git_log and settings.gitlog_auto_convert else sections,
+            "stats": asdict(stats),
+        }
+        try:
+            self._index_path(file_id).write_text(json.dumps(file_index), encoding="utf-8")
+        except IOError:
+            pass  # Silently fail if can't write
+        return file_index
+
+    def _gitlog_stats(self, commits: List[Commit]) -> FileStats:
+        """Stats of a raw git log, with days as in its converted report."""
+        days = gitlog_parser.group_by_day(commits)
+        return FileStats(
+            commits=len(commits),
+            authors=sorted({commit.author for commit in commits if commit.author}),
+            first_date=days[0][0].isoformat() if days else None,
+            last_date=days[-1][0].isoformat() if days else None,
+            date_sections=len(days),
         )
 
+    def _stats(self, file_index: Optional[Dict[str, Any]]) -> Optional[FileStats]:
+        return FileStats(**file_index["stats"]) if file_index else None
+
+    def get_index(self, file_id: str, path: Path) -> Optional[Dict[str, Any]]:
+        """Load a file's date index, rebuilding it if missing or stale."""
+        try:
+            file_index = json.loads(self._index_path(file_id).read_text(encoding="utf-8"))
+            stat = path.stat()
+            if (
+                file_index["version"] == INDEX_VERSION
+                and file_index["size"] == stat.st_size
+                and file_index["mtime_ns"] == stat.st_mtime_ns
+            ):
+                return file_index
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return self.build_index(file_id, path)
+
+    def get_stats(self, file_id: str) -> Optional[FileStats]:
+        """Stats of an uploaded file, from its index."""
+        path = self.get_file_path(file_id)
+        return self._stats(self.get_index(file_id, path)) if path else None
+
+    def read_date_range(self, file_id: str, start: date, end: date) -> Optional[str]:
+        """
+        Markdown of an uploaded file cut to its date sections from start to end.
+
+        Only the byte ranges of those sections are read, using the file's
+        date index. Same result as select_date_range() on the whole file:
+        files without date sections are returned whole, None means nothing
+        is in range (or the file is missing).
+        """
+        path = self.get_file_path(file_id)
+        if path is None:
+            return None
+
+        file_index = self.get_index(file_id, path)
+        if file_index is None or file_index["sections"] is None:
+            return markdown_parser.prepare_date_range(path.read_text(encoding="utf-8"), start, end)
+        if not file_index["sections"]:
+            return path.read_text(encoding="utf-8")
+
+        first, last = start.isoformat(), end.isoformat()
+        spans = [(s, e) for day, s, e in file_index["sections"] if day and first <= day <= last]
+        if not spans:
+            return None
+
+        parts = []
+        with open(path, "rb") as f:
+            for span_start, span_end in spans:
+                f.seek(span_start)
+                parts.append(f.read(span_end - span_start).decode("utf-8"))
+        return "\n".join(parts)
+
     def delete_file(self, file_id: str) -> bool:
         """Delete an uploaded file."""
         path = self.get_file_path(file_id)
         if path and path.exists():
             path.unlink()
+            self._index_path(file_id).unlink(missing_ok=True)
 
             # Remove from mapping
             if file_id in self.filename_mapping:
@@ -178,6 +389,7 @@ class FileManager:
                         file_path=path,
                         size=stat.st_size,
                         uploaded_at=datetime.fromtimestamp(stat.st_mtime),
+                        stats=self._stats(self.get_index(file_id, path)),
                     )
                 )
         return sorted(files, key=lambda x: x.uploaded_at, reverse=True)
@@ -192,6 +404,7 @@ class FileManager:
                 mtime = datetime.fromtimestamp(path.stat().st_mtime)
                 if mtime < cutoff:
                     path.unlink()
+                    self._index_path(path.stem).unlink(missing_ok=True)
                     deleted += 1
 
         return deleted
@@ -0,0 +1,316 @@
+"""Deterministic conversion of raw `git log` output into report markdown."""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+MONTHS_ID = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+MONTHS_EN = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+COMMIT_RE = re.compile(r"commit ([0-9a-f]{7,40})\b")
+AUTHOR_RE = re.compile(r"Author:\s*(.*?)\s*(?:<([^>]*)>)?\s*$")
+# Default format ("Wed Dec 24 01:28:45 2025 +0000") and ISO-like ("2025-12-24 01:28:45 +0000")
+DATE_DEFAULT_RE = re.compile(r"\w{3} (\w{3}) +(\d{1,2}) (\d\d):(\d\d):(\d\d) (\d{4}) ([+-]\d{4})")
+DATE_ISO_RE = re.compile(r"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d) ?([+-]\d\d:?\d\d|Z)")
+SHORTSTAT_RE = re.compile(
+    r"\s*(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?"
+)
+MERGE_BRANCH_RE = re.compile(r"Merge (?:remote-tracking )?branch '([^']+)'(?: of \S+)?(?: into '?([^'\s]+)'?)?")
+CONVENTIONAL_RE = re.compile(r"^(?:feat|fix|chore|refactor|docs|style|test|perf|build|ci)(?:\([^)]*\))?!?:\s*", re.I)
+
+# Subject keywords of the report's feature, bug fix and UI/UX lists
+FEATURE_RE = re.compile(r"^(?:feat\b|add|adding|added|implement|introduce|create|new\b|menambahkan|penambahan|tambah)", re.I)
+BUGFIX_RE = re.compile(r"\b(?:fix|fixing|fixed|bug|hotfix|perbaikan|memperbaiki|error|crash)", re.I)
+UI_RE = re.compile(r"\b(?:ui|ux|layout|tampilan|design|style|styling|widget|snackbar|dialog|sheet|button|screen|page|navigation)\b", re.I)
+
+TITLE_MAX_CHARS = 80
+
+
+@dataclass
+class Commit:
+    """One commit of a git log."""
+    hash: str
+    author: str = ""
+    email: str = ""
+    date: Optional[datetime] = None  # Timezone-aware, in the committer's offset
+    parents: List[str] = field(default_factory=list)  # Only listed for merges
+    message: List[str] = field(default_factory=list)  # Message lines, unindented
+    files_changed: int = 0
+    insertions: int = 0
+    deletions: int = 0
+
+    @property
+    def short_hash(self) -> str:
+        return self.hash[:7]
+
+    @property
+    def is_merge(self) -> bool:
+        return len(self.parents) > 1
+
+    @cached_property
+    def subject(self) -> str:
+        return next((line.strip() for line in self.message if line.strip()), "")
+
+
+def is_git_log(text: str) -> bool:
+    """Whether text is raw `git log` output rather than markdown."""
+    return COMMIT_RE.match(text.lstrip()) is not None
+
+
+class GitLogParser:
+    """Streams raw git log text into commits and renders the report skeleton."""
+
+    def __init__(self):
+        self._timezones: Dict[str, timezone] = {}
+
+    def _tz(self, offset: str) -> timezone:
+        """Timezone of a "+0700" / "+07:00" / "Z" offset, shared between commits."""
+        tz = self._timezones.get(offset)
+        if tz is None:
+            if offset == "Z":
+                tz = timezone.utc
+            else:
+                digits = offset[1:].replace(":", "")
+                minutes = int(digits[:2]) * 60 + int(digits[2:])
+                tz = timezone(timedelta(minutes=-minutes if offset[0] == "-" else minutes))
+            self._timezones[offset] = tz
+        return tz
+
+    def _parse_date(self, value: str) -> Optional[datetime]:
+        """Parse the value of a Date: line."""
+        match = DATE_DEFAULT_RE.match(value)
+        try:
+            if match:
+                month = MONTHS_EN.get(match.group(1))
+                if month is None:
+                    return None
+                return datetime(
+                    int(match.group(6)), month, int(match.group(2)),
+                    int(match.group(3)), int(match.group(4)), int(match.group(5)),
+                    tzinfo=self._tz(match.group(7)),
+                )
+            match = DATE_ISO_RE.match(value)
+            if match:
+                return datetime(
+                    *(int(match.group(i)) for i in range(1, 7)),
+                    tzinfo=self._tz(match.group(7)),
+                )
+        except ValueError:
+            return None
+        return None
+
+    def iter_commits(self, lines: Iterable[str]) -> Iterator[Commit]:
+        """
+        Parse git log lines into commits, in log order.
+
+        Understands the default and medium/fuller formats, ISO dates, and
+        --stat/--shortstat summaries. Other lines are ignored.
+        """
+        commit: Optional[Commit] = None
+        for line in lines:
+            if line.startswith("    "):
+                if commit is not None:
+                    commit.message.append(line[4:].rstrip("\r\n"))
+                continue
+            line = line.rstrip("\r\n")
+            if line.startswith("commit "):
+                match = COMMIT_RE.match(line)
+                if match:
+                    if commit is not None:
+                        yield commit
+                    commit = Commit(hash=match.group(1))
+                    continue
+            if commit is None:
+                continue
+
+            if line.startswith("Author:"):
+                match = AUTHOR_RE.match(line)
+                commit.author, commit.email = match.group(1), match.group(2) or ""
+            elif line.startswith(("Date:", "AuthorDate:")):
+                commit.date = self._parse_date(line.split(":", 1)[1].strip())
+            elif line.startswith("Merge:"):
+                commit.parents = line[6:].split()
+            elif line.endswith(("changed", ")")) and "changed" in line:
+                match = SHORTSTAT_RE.match(line)
+                if match:
+                    commit.files_changed = int(match.group(1))
+                    commit.insertions = int(match.group(2) or 0)
+                    commit.deletions = int(match.group(3) or 0)
+
+        if commit is not None:
+            yield commit
+
+    def parse(self, text: str) -> List[Commit]:
+        """Parse a whole git log."""
+        return list(self.iter_commits(text.split("\n")))
+
+    def group_by_day(self, commits: Iterable[Commit]) -> List[Tuple[date, List[Commit]]]:
+        """
+        Group commits by calendar day, oldest day first, ordered by time.
+
+        The grouped commits are copies dated in the log's most common UTC
+        offset, so a merge stamped +0000 by the server lands on the team's
+        local day and clock; the commits passed in are left untouched.
+        Commits without a date are left out.
+        """
+        dated = [commit for commit in commits if commit.date is not None]
+        if not dated:
+            return []
+        local_tz = Counter(commit.date.utcoffset() for commit in dated).most_common(1)[0][0]
+        tz = timezone(local_tz)
+
+        days: Dict[date, List[Commit]] = {}
+        for commit in dated:
+            local = replace(commit, date=commit.date.astimezone(tz))
+            days.setdefault(local.date.date(), []).append(local)
+
+        return [(day, sorted(days[day], key=lambda c: c.date)) for day in sorted(days)]
+
+    def _format_day(self, day: date) -> str:
+        return f"{day.day} {MONTHS_ID[day.month - 1]} {day.year}"
+
+    def _format_period(self, first: date, last: date) -> str:
+        """"22 sampai 24 Desember 2025", with month and year only where they differ."""
+        if first == last:
+            return self._format_day(first)
+        if (first.year, first.month) == (last.year, last.month):
+            start = str(first.day)
+        elif first.year == last.year:
+            start = f"{first.day} {MONTHS_ID[first.month - 1]}"
+        else:
+            start = self._format_day(first)
+        return f"{start} sampai {self._format_day(last)}"
+
+    def _title(self, commit: Commit) -> str:
+        """Section title of a commit, from its subject."""
+        subject = commit.subject
+        match = MERGE_BRANCH_RE.match(subject)
+        if match:
+            target = f" ke {match.group(2)}" if match.group(2) else ""
+            return f"Merge Branch {match.group(1)}{target}"
+
+        title = CONVENTIONAL_RE.sub("", subject) or subject or commit.short_hash
+        if len(title) > TITLE_MAX_CHARS:
+            title = title[:TITLE_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+        return title[0].upper() + title[1:]
+
+    def _description(self, commit: Commit) -> List[str]:
+        """Description bullets: the message minus merge boilerplate."""
+        lines = [line.strip() for line in commit.message if line.strip()]
+        if commit.is_merge or MERGE_BRANCH_RE.match(commit.subject):
+            lines = [line for line in lines[1:] if not line.startswith("See merge request")]
+        return [line[2:] if line.startswith(("- ", "* ")) else line for line in lines]
+
+    def to_markdown(
+        self,
+        commits: Iterable[Commit],
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> str:
+        """
+        Render commits in the structure of the AI report prompt.
+
+        Title, summary, one section per day (oldest first) with one
+        subsection per commit, statistics, and feature / bug fix / UI lists
+        picked from commit subjects by keyword. With start and/or end only
+        the days in that range are rendered and counted.
+        """
+        return self.days_to_markdown([
+            (day, day_commits)
+            for day, day_commits in self.group_by_day(commits)
+            if (start is None or day >= start) and (end is None or day <= end)
+        ])
+
+    def days_to_markdown(self, days: List[Tuple[date, List[Commit]]]) -> str:
+        """to_markdown() on commits already grouped by group_by_day()."""
+        if not days:
+            return ""
+
+        all_commits = [commit for _, day_commits in days for commit in day_commits]
+        authors = sorted({commit.author for commit in all_commits if commit.author})
+        merges = sum(1 for commit in all_commits if commit.is_merge)
+        period = self._format_period(days[0][0], days[-1][0])
+
+        lines = [
+            f"# Changelog - {period}",
+            "",
+            "## Ringkasan Perubahan",
+            "",
+            f"Periode ini mencakup {len(all_commits)} commit dalam {len(days)} hari"
+            + (f" oleh {', '.join(authors)}" if authors else "")
+            + (f", termasuk {merges} merge commit." if merges else "."),
+            "",
+            "---",
+            "",
+        ]
+
+        titles = {id(commit): self._title(commit) for commit in all_commits}
+        for day, day_commits in days:
+            lines.extend([f"## {self._format_day(day)}", ""])
+            for number, commit in enumerate(day_commits, 1):
+                lines.extend([
+                    f"### {number}. {titles[id(commit)]}",
+                    f"**Commit:** `{commit.short_hash}`",
+                    f"**Author:** {commit.author}",
+                    f"**Waktu:** {commit.date.hour:02d}:{commit.date.minute:02d}",
+                    "",
+                ])
+                description = self._description(commit)
+                if description:
+                    lines.append("**Deskripsi:**")
+                    lines.extend(f"- {line}" for line in description)
+                    lines.append("")
+                lines.extend(["---", ""])
+
+        lines.extend([
+            "## Statistik Perubahan",
+            "",
+            "| Kategori | Jumlah |",
+            "|----------|--------|",
+            f"| Total Commits | {len(all_commits)} |",
+            f"| Merge Commits | {merges} |",
+            f"| Author | {len(authors)} |",
+            f"| Hari Kerja | {len(days)} |",
+        ])
+        if any(commit.files_changed for commit in all_commits):
+            lines.extend([
+                f"| File Dimodifikasi | {sum(c.files_changed for c in all_commits)} |",
+                f"| Baris Ditambah | {sum(c.insertions for c in all_commits)} |",
+                f"| Baris Dihapus | {sum(c.deletions for c in all_commits)} |",
+            ])
+        lines.append("")
+
+        regular = [commit for commit in all_commits if not commit.is_merge and not MERGE_BRANCH_RE.match(commit.subject)]
+        for heading, pattern, search in (
+            ("Fitur Utama yang Ditambahkan", FEATURE_RE, False),
+            ("Perbaikan Bug", BUGFIX_RE, True),
+            ("Peningkatan UI/UX", UI_RE, True),
+        ):
+            picked: Dict[str, None] = {}  # Ordered set
+            for commit in regular:
+                subject = commit.subject
+                if (pattern.search(subject) if search else pattern.match(subject)):
+                    picked[titles[id(commit)]] = None
+            if picked:
+                lines.extend([f"## {heading}", ""])
+                lines.extend(f"{i}. {title}" for i, title in enumerate(picked, 1))
+                lines.append("")
+
+        return "\n".join(lines)
+
+    def convert(self, lines: Iterable[str], start: Optional[date] = None, end: Optional[date] = None) -> str:
+        """Raw git log lines to report markdown, optionally of the days from start to end."""
+        return self.to_markdown(self.iter_commits(lines), start, end)
+
+
+# Singleton instance
+gitlog_parser = GitLogParser()
@@ -0,0 +1,327 @@
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from markdown.extensions import Extension
+from markdown.extensions.attr_list import AttrListExtension
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension, HiliteTreeprocessor, parse_hl_lines
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from markdown.preprocessors import Preprocessor
+
+from app.config import settings
+
+try:
+    from pygments.lexers import guess_lexer
+    from pygments.util import ClassNotFound
+except ImportError:  # pragma: no cover
+    guess_lexer = None
+
+# Interpreters named in a shebang line
+SHEBANG_LANGS = {
+    "python": "python",
+    "bash": "bash",
+    "sh": "bash",
+    "zsh": "bash",
+    "node": "javascript",
+    "php": "php",
+    "ruby": "ruby",
+    "perl": "perl",
+}
+
+# File extensions mentioned in code or in the commit text around it
+EXTENSION_LANGS = {
+    "py": "python",
+    "dart": "dart",
+    "js": "javascript",
+    "jsx": "jsx",
+    "ts": "typescript",
+    "tsx": "tsx",
+    "php": "php",
+    "go": "go",
+    "java": "java",
+    "kt": "kotlin",
+    "swift": "swift",
+    "rb": "ruby",
+    "rs": "rust",
+    "c": "c",
+    "h": "c",
+    "cpp": "cpp",
+    "cs": "csharp",
+    "sql": "sql",
+    "sh": "bash",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "json": "json",
+    "xml": "xml",
+    "html": "html",
+    "css": "css",
+    "scss": "scss",
+    "vue": "vue",
+    "gradle": "groovy",
+}
+
+SHEBANG_RE = re.compile(r"^#!\s*(?:\S*/)?(?:env\s+)?([A-Za-z]+)")
+DIFF_RE = re.compile(r"^(?:diff --git |@@ -\d|--- \S.*\n\+\+\+ )")
+GIT_LOG_RE = re.compile(r"^commit [0-9a-f]{7,40}\b")
+PATH_RE = re.compile(r"[\w./-]+\.([A-Za-z]{1,6})\b")
+
+# Anything that looks like source code rather than a prose commit message
+CODE_SIGNAL_RE = re.compile(
+    r"[{};]|=>|->|::|==|!=|\w\(|</?[A-Za-z][\w-]*[ />]"
+    r"|^\s*[\w.-]+\s*[:=]\s*\S+\s*$"
+    r"|^\s*(?:def|class|import|from|function|const|let|var|return|if|for|while|"
+    r"public|private|SELECT|INSERT|UPDATE|DELETE|CREATE)\b",
+    re.MULTILINE,
+)
+
+# Characters of the paragraph before a fence searched for file-extension hints
+CONTEXT_CHARS = 300
+
+
+def _preceding_paragraph(text: str, end: int) -> str:
+    """The paragraph right before a position, unless it is another fence."""
+    before = text[max(0, end - CONTEXT_CHARS):end].rstrip()
+    paragraph = before.rsplit("\n\n", 1)[-1]
+    return "" if "```" in paragraph or "~~~" in paragraph else paragraph
+
+
+def detect_language(code: str, context: str = "") -> Optional[str]:
+    """
+    Cheap language detection for code without a declared language.
+
+    Returns a Pygments alias, or None when only lexer guessing can tell.
+    """
+    first_line = code.lstrip("\n").split("\n", 1)[0]
+    match = SHEBANG_RE.match(first_line)
+    if match:
+        return SHEBANG_LANGS.get(match.group(1))
+    if first_line.startswith("<?php"):
+        return "php"
+    if DIFF_RE.match(code.lstrip("\n")):
+        return "diff"
+    if GIT_LOG_RE.match(first_line):
+        return "text"
+
+    # Commit messages indented under a git log entry are plain prose
+    if not CODE_SIGNAL_RE.search(code):
+        return "text"
+
+    for text in (code, context):
+        hints = Counter(
+            EXTENSION_LANGS[ext.lower()]
+            for ext in PATH_RE.findall(text)
+            if ext.lower() in EXTENSION_LANGS
+        )
+        if hints:
+            return hints.most_common(1)[0][0]
+    return None
+
+
+class HighlightCache:
+    """
+    Size-bounded LRU of highlighted code blocks and guessed languages.
+
+    Highlighted HTML is keyed by code text, language and formatter options;
+    guesses are keyed by code text alone, as Pygments guesses from it only.
+    """
+
+    def __init__(self, max_size: int = settings.highlight_cache_max_size):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.guesses = 0
+
+    def get(self, key: Tuple) -> Optional[str]:
+        """Look up an entry."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple, value: str):
+        """Store an entry, evicting old ones."""
+        size = len(key[1]) + len(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(key[1]) + len(previous)
+            self._entries[key] = value
+            self._size += size
+
+            while self._size > self.max_size and len(self._entries) > 1:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted_key[1]) + len(evicted)
+
+    def guess_language(self, code: str) -> str:
+        """Pygments lexer guess for code, memoized."""
+        key = ("guess", code)
+        lang = self.get(key)
+        if lang is None:
+            try:
+                lang = guess_lexer(code).aliases[0]
+            except (ClassNotFound, IndexError):
+                lang = "text"
+            with self._lock:
+                self.guesses += 1
+            self.put(key, lang)
+        return lang
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "guesses": self.guesses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "size": self._size,
+            "max_size": self.max_size,
+        }
+
+
+class CachedCodeHilite(CodeHilite):
+    """CodeHilite that resolves the language cheaply and caches its HTML."""
+
+    def hilite(self, shebang: bool = True) -> str:
+        self.src = self.src.strip("\n")
+        if self.lang is None and shebang:
+            self._parseHeader()
+        if self.lang is None and self.guess_lang and self.use_pygments and guess_lexer:
+            self.lang = detect_language(self.src) or highlight_cache.guess_language(self.src)
+
+        key = (
+            "html", self.src, self.lang, self.guess_lang, self.use_pygments,
+            self.lang_prefix, repr(self.pygments_formatter), repr(sorted(self.options.items())),
+        )
+        html = highlight_cache.get(key)
+        if html is None:
+            html = super().hilite(shebang=False)
+            highlight_cache.put(key, html)
+        return html
+
+
+class CachedHiliteTreeprocessor(HiliteTreeprocessor):
+    """Highlight indented code blocks through CachedCodeHilite."""
+
+    def run(self, root):
+        for block in root.iter("pre"):
+            if len(block) == 1 and block[0].tag == "code":
+                local_config = self.config.copy()
+                text = block[0].text
+                if text is None:
+                    continue
+                code = CachedCodeHilite(
+                    self.code_unescape(text),
+                    tab_length=self.md.tab_length,
+                    style=local_config.pop("pygments_style", "default"),
+                    **local_config,
+                )
+                placeholder = self.md.htmlStash.store(code.hilite())
+                block.clear()
+                block.tag = "p"
+                block.text = placeholder
+
+
+class CachedFencedBlockPreprocessor(FencedBlockPreprocessor):
+    """
+    fenced_code, highlighting through CachedCodeHilite.
+
+    Fences with a plain language (and optional hl_lines) are highlighted
+    here exactly as fenced_code would, but through the HTML cache. A
+    document with {attrs} fences, or without Pygments highlighting, is
+    left to fenced_code as a whole.
+    """
+
+    def _check_deps(self):
+        if not self.checked_for_deps:
+            for ext in self.md.registeredExtensions:
+                if isinstance(ext, CodeHiliteExtension):
+                    self.codehilite_conf = ext.getConfigs()
+                if isinstance(ext, AttrListExtension):
+                    self.use_attr_list = True
+            self.checked_for_deps = True
+
+    def _highlight(self, match: re.Match) -> str:
+        local_config = self.codehilite_conf.copy()
+        if match.group("hl_lines"):
+            local_config["hl_lines"] = parse_hl_lines(match.group("hl_lines"))
+        highliter = CachedCodeHilite(
+            match.group("code"),
+            lang=match.group("lang") or None,
+            style=local_config.pop("pygments_style", "default"),
+            **local_config,
+        )
+        placeholder = self.md.htmlStash.store(highliter.hilite(shebang=False))
+        return f"\n{placeholder}\n"
+
+    def run(self, lines: List[str]) -> List[str]:
+        self._check_deps()
+        if not (self.codehilite_conf and self.codehilite_conf["use_pygments"]):
+            return super().run(lines)
+        text = "\n".join(lines)
+        if any(match.group("attrs") for match in self.FENCED_BLOCK_RE.finditer(text)):
+            return super().run(lines)
+        return self.FENCED_BLOCK_RE.sub(self._highlight, text).split("\n")
+
+
+class FenceLanguagePreprocessor(Preprocessor):
+    """
+    Declare a language on fenced blocks that have none.
+
+    fenced_code then highlights them without running lexer guessing; the
+    declared language is what the guess would have set, unless a cheap
+    hint (shebang, diff, file extensions nearby) decided first.
+    """
+
+    def _annotate(self, match: re.Match) -> str:
+        if match.group("lang") or match.group("attrs"):
+            return match.group(0)
+        code = match.group("code")
+        context = _preceding_paragraph(match.string, match.start())
+        lang = detect_language(code, context) or highlight_cache.guess_language(code.strip("\n"))
+        fence_end = match.end("fence") - match.start()
+        return match.group(0)[:fence_end] + lang + match.group(0)[fence_end:]
+
+    def run(self, lines: List[str]) -> List[str]:
+        text = "\n".join(lines)
+        return FencedBlockPreprocessor.FENCED_BLOCK_RE.sub(self._annotate, text).split("\n")
+
+
+class HighlightExtension(Extension):
+    """Swap codehilite's and fenced_code's highlighting for the cached, hint-first variant."""
+
+    def extendMarkdown(self, md):
+        if "hilite" not in md.treeprocessors:
+            return
+        hiliter = md.treeprocessors["hilite"]
+        cached = CachedHiliteTreeprocessor(md)
+        cached.config = hiliter.config
+        md.treeprocessors.register(cached, "hilite", 30)
+
+        if "fenced_code_block" in md.preprocessors:
+            fenced = md.preprocessors["fenced_code_block"]
+            md.preprocessors.register(CachedFencedBlockPreprocessor(md, fenced.config), "fenced_code_block", 25)
+
+        if guess_lexer and hiliter.config.get("guess_lang") and hiliter.config.get("use_pygments", True):
+            # Must run before fenced_code_block (25)
+            md.preprocessors.register(FenceLanguagePreprocessor(md), "fence_language", 27)
+
+
+# Singleton instance
+highlight_cache = HighlightCache()
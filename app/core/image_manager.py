@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from dataclasses import dataclass
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps
 
 from app.config import settings
 
@@ -35,6 +37,10 @@ class ImageManager:
         self.allowed_extensions = allowed_extensions
         self.images_dir.mkdir(parents=True, exist_ok=True)
 
+        # Print-resolution derivatives used when embedding images in PDFs
+        self.print_dir = self.images_dir / "print"
+        self.print_dir.mkdir(parents=True, exist_ok=True)
+
     def _extract_title_from_filename(self, filename: str) -> str:
         """
         Extract a readable title from filename.
@@ -72,6 +78,69 @@ class ImageManager:
                 detail=f"Image type not allowed. Allowed: {', '.join(self.allowed_extensions)}",
             )
 
+    def _get_print_derivative_path(self, image_id: str) -> Path:
+        """Path of the print-resolution derivative of an image."""
+        return self.print_dir / f"{image_id}.jpg"
+
+    def create_print_derivative(self, image_id: str) -> Optional[Path]:
+        """
+        Create a print-resolution JPEG of an image for PDF embedding.
+
+        The image is downscaled to fit the A4 content box, flattened onto
+        white, re-encoded as JPEG and stripped of metadata. Returns None if
+        the original is already smaller than the derivative would be.
+        """
+        source = self.get_image_path(image_id)
+        if source is None:
+            return None
+
+        derivative_path = self._get_print_derivative_path(image_id)
+
+        try:
+            with Image.open(source) as img:
+                img = ImageOps.exif_transpose(img)
+                needs_resize = img.width > settings.image_print_max_width
+
+                if needs_resize:
+                    height = round(img.height * settings.image_print_max_width / img.width)
+                    img = img.resize(
+                        (settings.image_print_max_width, height),
+                        Image.Resampling.LANCZOS,
+                    )
+
+                # Flatten transparency onto white, JPEG has no alpha channel
+                if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                    rgba = img.convert("RGBA")
+                    background = Image.new("RGB", rgba.size, (255, 255, 255))
+                    background.paste(rgba, mask=rgba.getchannel("A"))
+                    img = background
+                elif img.mode != "RGB":
+                    img = img.convert("RGB")
+
+                # No exif/icc passed to save, so metadata is dropped
+                img.save(
+                    derivative_path,
+                    "JPEG",
+                    quality=settings.image_print_quality,
+                    optimize=True,
+                    progressive=True,
+                )
+        except (OSError, ValueError):
+            return None
+
+        if not needs_resize and derivative_path.stat().st_size >= source.stat().st_size:
+            derivative_path.unlink()
+            return None
+
+        return derivative_path
+
+    def get_print_path(self, image_id: str) -> Optional[Path]:
+        """Get the path to embed in PDFs: the print derivative if it helps, else the original."""
+        derivative_path = self._get_print_derivative_path(image_id)
+        if derivative_path.exists():
+            return derivative_path
+        return self.get_image_path(image_id)
+
     async def save_image(self, file: UploadFile) -> ImageMetadata:
         """Save an uploaded image with validation."""
         self._validate_image(file)
@@ -92,6 +161,9 @@ class ImageManager:
         async with aiofiles.open(file_path, "wb") as f:
             await f.write(content)
 
+        # Build the print derivative once, at upload time
+        await run_in_threadpool(self.create_print_derivative, image_id)
+
         title = self._extract_title_from_filename(file.filename)
 
         return ImageMetadata(
@@ -131,6 +203,7 @@ class ImageManager:
         path = self.get_image_path(image_id)
         if path and path.exists():
             path.unlink()
+            self._get_print_derivative_path(image_id).unlink(missing_ok=True)
             return True
         return False
 
@@ -164,6 +237,7 @@ class ImageManager:
                 mtime = datetime.fromtimestamp(path.stat().st_mtime)
                 if mtime < cutoff:
                     path.unlink()
+                    self._get_print_derivative_path(path.stem).unlink(missing_ok=True)
                     deleted += 1
 
         return deleted
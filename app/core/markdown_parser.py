@@ -1,10 +1,46 @@
+import os
 import re
+import time
+import multiprocessing
+import queue
+import tempfile
+import threading
 import markdown
+from markdown.blockprocessors import ReferenceProcessor
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+from markdown.extensions.toc import nest_toc_tokens, unique
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 from enum import Enum
-from datetime import datetime
+from datetime import date, datetime
+
+from app.config import settings
+from app.core.dedup import Deduplicator
+from app.core.gitlog_parser import gitlog_parser, is_git_log
+from app.core.highlight import HighlightExtension
+from app.core.metrics import markdown_pool_wait
+from app.core.parse_cache import parse_cache, ParsedFragment
+
+HEADER_ID_RE = re.compile(r'(<h[1-6][^>]*?\sid=")([^"]*)(")')
+
+# A "## 22 Desember 2025" line; whitespace never spans lines, as when matching line by line
+DATE_HEADER_RE = re.compile(
+    r'^#{1,2}(?P<sep>[^\S\n]+)(?P<day>\d{1,2})[^\S\n]+(?P<month>\w+)[^\S\n]+(?P<year>\d{4})[^\n]*',
+    re.MULTILINE,
+)
+HEADER_DATE_RE = re.compile(r'#+ (\d{1,2})\s+(\w+)\s+(\d{4})', re.IGNORECASE)
+NON_BLANK_RE = re.compile(r'\S')
+# "[id]: url" lines, as the parser finds them outside fenced code
+LINK_DEFINITION_RE = ReferenceProcessor.RE
+FENCED_BLOCK_RE = FencedBlockPreprocessor.FENCED_BLOCK_RE
+
+# Paragraph appended to every fragment so its HTML keeps the trailing
+# whitespace it has inside a whole document (convert() strips it)
+FRAGMENT_END = "fragmentend0d4c1e"
+FRAGMENT_END_HTML = f"<p>{FRAGMENT_END}</p>"
 
 
 class CombineMode(str, Enum):
@@ -14,6 +50,127 @@ class CombineMode(str, Enum):
     CHAPTERED = "chaptered"    # Each file gets page break
 
 
+@dataclass
+class DateSection:
+    """Offsets of one date section inside the indexed text."""
+    date: Optional[datetime]
+    start: int       # Start of the header line
+    header_end: int  # End of the header line
+    end: int         # End of the section body (before the next header's newline)
+
+
+@dataclass
+class SectionIndex:
+    """
+    Date sections of a markdown document as offsets into its text.
+
+    Built in one pass; the preamble, headers and bodies are read back as
+    slices, so sorting or selecting sections copies the text only once.
+    """
+    text: str
+    sections: List[DateSection]
+
+    @property
+    def lead(self) -> Optional[str]:
+        """Content before the first date header, None if the text starts with one."""
+        if not self.sections:
+            return self.text
+        start = self.sections[0].start
+        return self.text[:start - 1] if start else None
+
+    def header(self, section: DateSection) -> str:
+        return self.text[section.start:section.header_end]
+
+    def body(self, section: DateSection) -> str:
+        return self.text[section.header_end + 1:section.end]
+
+    def has_body(self, section: DateSection) -> bool:
+        """Whether the body has any non-whitespace content."""
+        return NON_BLANK_RE.search(self.text, section.header_end, section.end) is not None
+
+    def section_text(self, section: DateSection) -> str:
+        """Header plus body, or the header alone when the body is blank."""
+        return self.text[section.start:section.end if self.has_body(section) else section.header_end]
+
+    def sorted_sections(self) -> List[DateSection]:
+        """Sections oldest first, undated ones last, otherwise in document order."""
+        return sorted(self.sections, key=lambda s: (s.date is None, s.date or datetime.max))
+
+
+class SectionSpool:
+    """
+    Date-sorted store of markdown pieces with a bounded memory footprint.
+
+    Pieces are kept in memory until max_memory characters are held; the
+    rest goes to an anonymous temporary file and is read back while the
+    sorted pieces are iterated.
+    """
+
+    def __init__(self, max_memory: int = settings.combine_max_memory):
+        self.max_memory = max_memory
+        self.preamble: List[Union[str, Tuple[int, int]]] = []
+        self._groups: List[Tuple[Optional[datetime], List[Union[str, Tuple[int, int]]]]] = []
+        self._memory = 0
+        self._file = None
+        self._sorted = True
+        self.size = 0  # Characters stored
+
+    def _store(self, text: str) -> Union[str, Tuple[int, int]]:
+        """Keep text in memory if it fits, else spill it. Returns a chunk."""
+        self.size += len(text)
+        if self._memory + len(text) <= self.max_memory:
+            self._memory += len(text)
+            return text
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        data = text.encode("utf-8")
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        return offset, len(data)
+
+    def _load(self, chunk: Union[str, Tuple[int, int]]) -> str:
+        if isinstance(chunk, str):
+            return chunk
+        offset, length = chunk
+        self._file.seek(offset)
+        return self._file.read(length).decode("utf-8")
+
+    def add_section(self, date: Optional[datetime], text: str):
+        """Add a date section."""
+        self._groups.append((date, [self._store(text)]))
+        self._sorted = False
+
+    def add_continuation(self, text: str):
+        """Add text that stays with the previous section (or the preamble)."""
+        (self._groups[-1][1] if self._groups else self.preamble).append(self._store(text))
+
+    def sort(self):
+        """Order sections oldest first, undated ones last (stable)."""
+        if not self._sorted:
+            self._groups.sort(key=lambda x: (x[0] is None, x[0] if x[0] else datetime.max))
+            self._sorted = True
+
+    def __iter__(self) -> Iterator[str]:
+        """Preamble first, then sections oldest first, undated ones last."""
+        self.sort()
+        for chunk in self.preamble:
+            yield self._load(chunk)
+        for _, chunks in self._groups:
+            for chunk in chunks:
+                yield self._load(chunk)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SectionSpool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 @dataclass
 class ParsedMarkdown:
     """Result of parsing markdown content."""
@@ -22,43 +179,486 @@ class ParsedMarkdown:
     meta: Dict[str, Any]
 
 
-class MarkdownParser:
-    """Converts Markdown to HTML with extensions."""
-
-    def __init__(self):
-        self.md = markdown.Markdown(
-            extensions=[
-                "tables",
-                "fenced_code",
-                "codehilite",
-                "toc",
-                "meta",
-                "nl2br",
-                "sane_lists",
-                "attr_list",
-            ],
-            extension_configs={
-                "codehilite": {
-                    "css_class": "highlight",
-                    "linenums": False,
-                    "guess_lang": True,
-                },
-                "toc": {
-                    "permalink": False,
-                    "toc_depth": 3,
-                },
+def create_markdown() -> markdown.Markdown:
+    """Create a Markdown instance with the report extensions."""
+    return markdown.Markdown(
+        extensions=[
+            "tables",
+            "fenced_code",
+            "codehilite",
+            "toc",
+            "meta",
+            "nl2br",
+            "sane_lists",
+            "attr_list",
+            HighlightExtension(),
+        ],
+        extension_configs={
+            "codehilite": {
+                "css_class": "highlight",
+                "linenums": False,
+                "guess_lang": True,
             },
-        )
+            "toc": {
+                "permalink": False,
+                "toc_depth": 3,
+            },
+        },
+    )
+
+
+class MarkdownPool:
+    """
+    Pool of preconfigured Markdown instances.
+
+    A Markdown object keeps per-document state (toc, Meta, stashes), so a
+    thread must hold one exclusively while converting. Instances are
+    created on demand up to size; beyond that callers wait for a free one.
+    """
+
+    def __init__(self, size: int = settings.markdown_pool_size):
+        self.size = max(1, size)
+        self._idle: "queue.LifoQueue[markdown.Markdown]" = queue.LifoQueue()
+        self._created = 0
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> markdown.Markdown:
+        """Take an idle instance, create one, or wait for one."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            return create_markdown()
+
+        return self._idle.get()
+
+    @contextmanager
+    def checkout(self) -> Iterator[markdown.Markdown]:
+        """Borrow a reset Markdown instance for the duration of the block."""
+        start = time.perf_counter()
+        md = self._acquire()
+        markdown_pool_wait.observe(time.perf_counter() - start)
+
+        with self._lock:
+            self._in_use += 1
+        try:
+            md.reset()
+            yield md
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._idle.put(md)
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool usage."""
+        return {"size": self.size, "created": self._created, "in_use": self._in_use}
+
+
+class MarkdownParser:
+    """Converts Markdown to HTML with extensions. Safe to use from several threads."""
+
+    def __init__(
+        self,
+        pool: Optional[MarkdownPool] = None,
+        parse_workers: int = settings.parse_workers or os.cpu_count() or 1,
+        parallel_min_size: int = settings.parallel_parse_min_size,
+    ):
+        self.pool = pool or MarkdownPool()
+        self.parse_workers = max(1, parse_workers)
+        self.parallel_min_size = parallel_min_size
+        # Markdown handed to parse_fragments at a time when streaming; enough to use every worker
+        self.stream_batch_size = parallel_min_size * self.parse_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
     def parse(self, md_content: str) -> ParsedMarkdown:
         """Convert markdown to HTML with metadata."""
-        self.md.reset()
-        html = self.md.convert(md_content)
-        toc = getattr(self.md, "toc", "")
-        meta = getattr(self.md, "Meta", {})
+        with self.pool.checkout() as md:
+            html = md.convert(md_content)
+            toc = getattr(md, "toc", "")
+            meta = getattr(md, "Meta", {})
 
         return ParsedMarkdown(html=html, toc=toc, meta=meta)
 
+    def parse_fragment(self, md_content: str) -> ParsedFragment:
+        """Parse a piece of markdown, reusing the cached result for the same text."""
+        key = parse_cache.make_key(md_content)
+        fragment = parse_cache.get(key)
+        if fragment is None:
+            fragment = self._convert_fragment(md_content)
+            parse_cache.put(key, fragment)
+        return fragment
+
+    def _convert_fragment(self, md_content: str) -> ParsedFragment:
+        """Parse a piece of markdown into a fragment (uncached)."""
+        with self.pool.checkout() as md:
+            html = md.convert(f"{md_content}\n\n{FRAGMENT_END}")
+            if html.endswith(FRAGMENT_END_HTML):
+                html = html[:-len(FRAGMENT_END_HTML)]
+            else:  # Swallowed by an unterminated block, parse it plainly
+                md.reset()
+                html = md.convert(md_content) + "\n"
+            toc_tokens = getattr(md, "toc_tokens", [])
+
+        tokens = []
+        stack = list(reversed(toc_tokens))
+        while stack:
+            token = stack.pop()
+            tokens.append({"level": token["level"], "id": token["id"], "name": token["name"]})
+            stack.extend(reversed(token.get("children", [])))
+
+        return ParsedFragment(
+            html=html,
+            toc_tokens=tokens,
+            header_ids=[match.group(2) for match in HEADER_ID_RE.finditer(html)],
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the parse process pool on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def parse_fragments(self, pieces: List[str]) -> List[ParsedFragment]:
+        """
+        Parse many pieces of markdown, in order, through the parse cache.
+
+        When the uncached pieces add up to parallel_parse_min_size or more,
+        they are split into size-balanced chunks and parsed on a process
+        pool, one chunk per core. Smaller inputs are parsed serially, where
+        process overhead would outweigh the gain.
+        """
+        keys = [parse_cache.make_key(piece) for piece in pieces]
+        fragments: List[Optional[ParsedFragment]] = [parse_cache.get(key) for key in keys]
+        missing = [i for i, fragment in enumerate(fragments) if fragment is None]
+
+        missing_size = sum(len(pieces[i]) for i in missing)
+        if self.parse_workers > 1 and len(missing) > 1 and missing_size >= self.parallel_min_size:
+            # Largest first onto the lightest chunk
+            chunks: List[List[int]] = [[] for _ in range(min(self.parse_workers, len(missing)))]
+            chunk_sizes = [0] * len(chunks)
+            for i in sorted(missing, key=lambda i: len(pieces[i]), reverse=True):
+                lightest = chunk_sizes.index(min(chunk_sizes))
+                chunks[lightest].append(i)
+                chunk_sizes[lightest] += len(pieces[i])
+
+            executor = self._get_executor()
+            futures = [
+                (chunk, executor.submit(_convert_fragments, [pieces[i] for i in chunk]))
+                for chunk in chunks
+            ]
+            for chunk, future in futures:
+                for i, fragment in zip(chunk, future.result()):
+                    fragments[i] = fragment
+        else:
+            for i in missing:
+                fragments[i] = self._convert_fragment(pieces[i])
+
+        for i in missing:
+            parse_cache.put(keys[i], fragments[i])
+        return fragments
+
+    def shutdown(self):
+        """Stop the parse worker processes."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _build_toc(self, toc_tokens: List[Dict[str, Any]]) -> str:
+        """Render flat TOC tokens exactly like the toc extension does."""
+        with self.pool.checkout() as md:
+            toc_processor = md.treeprocessors["toc"]
+            div = toc_processor.build_toc_div(nest_toc_tokens([dict(token) for token in toc_tokens]))
+            toc = md.serializer(div)
+            for postprocessor in md.postprocessors:
+                toc = postprocessor.run(toc)
+        return toc
+
+    def _dedupe_ids(self, fragments: Iterable[ParsedFragment]) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Yield each fragment's HTML and TOC tokens with heading ids made unique.
+
+        Ids are deduplicated across fragments the same way the toc extension
+        does within a single document, so links and the TOC match a parse of
+        the concatenated markdown.
+        """
+        used_ids = set()
+        for fragment in fragments:
+            renamed = {}
+            for header_id in fragment.header_ids:
+                new_id = unique(header_id, used_ids)
+                if new_id != header_id:
+                    renamed[header_id] = new_id
+
+            html = fragment.html
+            tokens = fragment.toc_tokens
+            if renamed:
+                html = HEADER_ID_RE.sub(
+                    lambda m: m.group(1) + renamed.get(m.group(2), m.group(2)) + m.group(3), html
+                )
+                tokens = [dict(token, id=renamed.get(token["id"], token["id"])) for token in tokens]
+            yield html, tokens
+
+    def _join_fragments(self, fragments: Iterable[ParsedFragment]) -> ParsedMarkdown:
+        """Join separately parsed fragments into one document."""
+        html_parts = []
+        toc_tokens = []
+        for html, tokens in self._dedupe_ids(fragments):
+            html_parts.append(html)
+            toc_tokens.extend(tokens)
+
+        html = "".join(html_parts).strip()
+        # Like Markdown.convert, an empty document has no TOC at all
+        toc = self._build_toc(toc_tokens) if html else ""
+        return ParsedMarkdown(html=html, toc=toc, meta={})
+
+    def join_sections(self, fragments: List[ParsedFragment]) -> Tuple[List[str], str]:
+        """
+        Like _join_fragments(), but keep each fragment's HTML separate.
+
+        Returns the HTML of every fragment and the TOC of the whole document.
+        """
+        html_parts = []
+        toc_tokens = []
+        for html, tokens in self._dedupe_ids(fragments):
+            html_parts.append(html)
+            toc_tokens.extend(tokens)
+
+        toc = self._build_toc(toc_tokens) if any(html.strip() for html in html_parts) else ""
+        return html_parts, toc
+
+    def parse_combined(
+        self,
+        contents: List[str],
+        filenames: Optional[List[str]] = None,
+        mode: CombineMode = CombineMode.SEQUENTIAL,
+    ) -> ParsedMarkdown:
+        """
+        Combine, date-sort and parse files using cached per-section fragments.
+
+        Produces the same HTML and TOC as parse(sort_by_date(combine_contents())),
+        but each date section and each file preamble is parsed on its own and
+        cached by content, so unchanged sections are never parsed again.
+        Metadata is not extracted on this path.
+        """
+        if mode not in (CombineMode.SEQUENTIAL, CombineMode.SECTIONED):
+            return self.parse(self.sort_by_date(self.combine_contents(contents, filenames, mode)))
+
+        return self._join_fragments(self.parse_fragments(self.split_pieces(contents, filenames, mode)))
+
+    def split_pieces(
+        self,
+        contents: List[str],
+        filenames: Optional[List[str]],
+        mode: CombineMode,
+    ) -> List[str]:
+        """
+        Split files into independently parseable pieces in date-sorted order.
+
+        Pieces are file preambles and date sections, ordered as they appear
+        in sort_by_date(combine_contents()). Pieces that may use a reference
+        link get the document's link definitions appended (see
+        link_definitions()).
+        """
+        preamble: List[str] = []
+        groups: List[Tuple[Optional[datetime], List[str]]] = []
+
+        for i, content in enumerate(contents):
+            if mode == CombineMode.SECTIONED and filenames and i < len(filenames):
+                content = f"## {self._chapter_title(filenames[i])}\n\n{content}"
+            # Same line structure as the "\n\n---\n\n" join in combine_contents
+            text = content if i == 0 else f"\n---\n\n{content}"
+
+            # Lines before a file's first date header continue the previous section
+            index = self.index_sections(text)
+            if index.lead is not None:
+                (groups[-1][1] if groups else preamble).append(index.lead)
+
+            for section in index.sections:
+                groups.append((section.date, [index.section_text(section)]))
+
+        groups.sort(key=lambda x: (x[0] is None, x[0] if x[0] else datetime.max))
+
+        pieces = preamble + [piece for _, group_pieces in groups for piece in group_pieces]
+        definitions = self.link_definitions(pieces)
+        return [self._append_definitions(piece, definitions) for piece in pieces]
+
+    def link_definitions(self, pieces: Iterable[str]) -> str:
+        """
+        Collect the reference-link definitions of a whole document.
+
+        Pieces are parsed separately, so a reference link in one date section
+        would otherwise not resolve against a definition in another.
+        Definitions inside fenced code are skipped; of several definitions
+        of one id the last wins, as in a single parse of the document.
+        """
+        definitions: Dict[str, str] = {}
+        for piece in pieces:
+            if "]:" not in piece:
+                continue
+            for match in LINK_DEFINITION_RE.finditer(FENCED_BLOCK_RE.sub("", piece)):
+                definitions[match.group(1).strip().lower()] = match.group(0).strip()
+        return "\n\n".join(definitions.values())
+
+    def _append_definitions(self, piece: str, definitions: str) -> str:
+        """Append link definitions to a piece that may use one."""
+        return f"{piece}\n\n{definitions}" if definitions and "[" in piece else piece
+
+    def parse_files(
+        self,
+        file_paths: List[Path],
+        mode: CombineMode = CombineMode.SEQUENTIAL,
+        max_memory: int = settings.combine_max_memory,
+        dedup: Optional[Deduplicator] = None,
+    ) -> ParsedMarkdown:
+        """
+        Combine, date-sort and parse files without loading them all at once.
+
+        Same result as parse_combined() on read_files(); files are read line
+        by line, and the sorted pieces are parsed in batches as they are
+        read back from a SectionSpool.
+        """
+        if mode not in (CombineMode.SEQUENTIAL, CombineMode.SECTIONED):
+            return self.parse(self.sort_by_date(self.combine_files(file_paths, mode, dedup)))
+
+        return self._join_fragments(self._parse_stream(self.iter_pieces(file_paths, mode, max_memory, dedup)))
+
+    def parse_spool(self, spool: SectionSpool) -> ParsedMarkdown:
+        """parse_files() on a spool from spool_files(); the caller closes it."""
+        return self._join_fragments(self._parse_stream(self.spool_pieces(spool)))
+
+    def _parse_stream(self, pieces: Iterable[str]) -> Iterator[ParsedFragment]:
+        """Parse pieces in batches of stream_batch_size characters."""
+        batch: List[str] = []
+        size = 0
+        for piece in pieces:
+            batch.append(piece)
+            size += len(piece)
+            if size >= self.stream_batch_size:
+                yield from self.parse_fragments(batch)
+                batch, size = [], 0
+        if batch:
+            yield from self.parse_fragments(batch)
+
+    def iter_pieces(
+        self,
+        file_paths: List[Path],
+        mode: CombineMode = CombineMode.SEQUENTIAL,
+        max_memory: int = settings.combine_max_memory,
+        dedup: Optional[Deduplicator] = None,
+    ) -> Iterator[str]:
+        """
+        Stream the pieces split_pieces() would produce for these files.
+
+        At most about max_memory characters of markdown are held at once;
+        the rest is spooled to a temporary file until it is yielded. With
+        dedup, repeated sections and commits are dropped as in read_files().
+        Link definitions are appended as in split_pieces(), which takes a
+        second pass over the spooled pieces.
+        """
+        with self.spool_files(file_paths, mode, max_memory, dedup) as spool:
+            yield from self.spool_pieces(spool)
+
+    def spool_files(
+        self,
+        file_paths: List[Path],
+        mode: CombineMode = CombineMode.SEQUENTIAL,
+        max_memory: int = settings.combine_max_memory,
+        dedup: Optional[Deduplicator] = None,
+    ) -> SectionSpool:
+        """Read files line by line into a SectionSpool of their sections (unsorted)."""
+        spool = SectionSpool(max_memory)
+        try:
+            count = 0
+            for path in file_paths:
+                if not path.exists():
+                    continue
+                # Same lines as the "\n\n---\n\n" join and section header of combine_contents
+                prefix = ["", "---", ""] if count else []
+                if mode == CombineMode.SECTIONED:
+                    prefix += [f"## {self._chapter_title(path.name)}", ""]
+                self._spool_lines(spool, self._read_lines(path, prefix), dedup)
+                count += 1
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    def spool_pieces(self, spool: SectionSpool) -> Iterator[str]:
+        """Date-sorted pieces of a spool, with the document's link definitions appended."""
+        definitions = self.link_definitions(spool)
+        for piece in spool:
+            yield self._append_definitions(piece, definitions)
+
+    def _read_lines(self, path: Path, prefix: List[str]) -> Iterator[str]:
+        """Lines of a file as prepare_source(read_text()).split('\n') would give them, read lazily."""
+        yield from prefix
+        ended = True
+        with open(path, encoding="utf-8") as f:
+            if settings.gitlog_auto_convert and is_git_log(f.read(4096)):
+                f.seek(0)
+                yield from gitlog_parser.convert(f).split("\n")
+                return
+            f.seek(0)
+            for line in f:
+                ended = line.endswith("\n")
+                yield line[:-1] if ended else line
+        if ended:
+            yield ""
+
+    def _spool_lines(self, spool: SectionSpool, lines: Iterable[str], dedup: Optional[Deduplicator] = None):
+        """Split one file's lines into date sections, like index_sections()."""
+        lead: List[str] = []
+        header: Optional[str] = None
+        date: Optional[datetime] = None
+        body: List[str] = []
+
+        def add_section():
+            text = self._section_text(header, body)
+            if dedup is not None:
+                text = dedup.section(text)
+            if text is not None:
+                spool.add_section(date, text)
+
+        if dedup is not None:
+            dedup.start_file()
+
+        for line in lines:
+            match = DATE_HEADER_RE.match(line) if line.startswith("#") else None
+            if match is None:
+                (lead if header is None else body).append(line)
+                continue
+
+            if header is not None:
+                add_section()
+            elif lead:
+                # Lines before a file's first date header continue the previous section
+                spool.add_continuation('\n'.join(lead))
+            header, date, body = line, self._header_date(match), []
+
+        if header is not None:
+            add_section()
+        elif lead:
+            spool.add_continuation('\n'.join(lead))
+
+    def _section_text(self, header: str, body: List[str]) -> str:
+        """Header plus body, or the header alone when the body is blank."""
+        if any(NON_BLANK_RE.search(line) for line in body):
+            return header + '\n' + '\n'.join(body)
+        return header
+
     def parse_file(self, file_path: Path) -> ParsedMarkdown:
         """Parse a markdown file."""
         content = file_path.read_text(encoding="utf-8")
@@ -81,7 +681,7 @@ class MarkdownParser:
             parts = []
             for i, content in enumerate(contents):
                 if filenames and i < len(filenames):
-                    name = Path(filenames[i]).stem.replace("_", " ").replace("-", " ").title()
+                    name = self._chapter_title(filenames[i])
                     parts.append(f"## {name}\n\n{content}")
                 else:
                     parts.append(content)
@@ -91,7 +691,7 @@ class MarkdownParser:
             parts = []
             for i, content in enumerate(contents):
                 if filenames and i < len(filenames):
-                    name = Path(filenames[i]).stem.replace("_", " ").replace("-", " ").title()
+                    name = self._chapter_title(filenames[i])
                     parts.append(f'<div class="chapter">\n\n## {name}\n\n{content}\n\n</div>')
                 else:
                     parts.append(f'<div class="chapter">\n\n{content}\n\n</div>')
@@ -103,18 +703,128 @@ class MarkdownParser:
         self,
         file_paths: List[Path],
         mode: CombineMode = CombineMode.SEQUENTIAL,
+        dedup: Optional[Deduplicator] = None,
     ) -> str:
         """Combine multiple markdown files into one string."""
+        contents, filenames = self.read_files(file_paths, dedup)
+        return self.combine_contents(contents, filenames, mode)
+
+    def _chapter_title(self, filename: str) -> str:
+        """Readable chapter title from a filename."""
+        return Path(filename).stem.replace("_", " ").replace("-", " ").title()
+
+    def _prefix_ids(self, html: str, prefix: str) -> str:
+        """Prefix heading ids and in-page links so chapters don't collide."""
+        html = re.sub(r'(<h[1-6][^>]*\sid=")', rf'\g<1>{prefix}', html)
+        return html.replace('href="#', f'href="#{prefix}')
+
+    def _merge_tocs(self, tocs: List[str]) -> str:
+        """Merge several TOC fragments into a single TOC."""
+        items = []
+        for toc in tocs:
+            start = toc.find("<ul>")
+            end = toc.rfind("</ul>")
+            if start != -1 and end != -1:
+                items.append(toc[start + len("<ul>"):end].strip("\n"))
+
+        if not items:
+            return ""
+        return '<div class="toc">\n<ul>\n' + "\n".join(items) + '\n</ul>\n</div>\n'
+
+    def parse_chapters(
+        self,
+        contents: List[str],
+        filenames: Optional[List[str]] = None,
+    ) -> Tuple[List[str], str]:
+        """
+        Parse each file as its own chapter (CHAPTERED mode).
+
+        Each chapter is date-sorted and parsed independently (from cached
+        section fragments), then wrapped in a chapter div. Returns the
+        chapter HTML fragments and the merged TOC.
+        """
+        chapter_pieces = []
+        for i, content in enumerate(contents):
+            if filenames and i < len(filenames):
+                content = f"## {self._chapter_title(filenames[i])}\n\n{content}"
+            chapter_pieces.append(self.split_pieces([content], None, CombineMode.SEQUENTIAL))
+
+        # Parse the pieces of all chapters in one go so they can run in parallel
+        fragments = self.parse_fragments([piece for pieces in chapter_pieces for piece in pieces])
+
+        chapters = []
+        tocs = []
+        offset = 0
+        for i, pieces in enumerate(chapter_pieces):
+            parsed = self._join_fragments(fragments[offset:offset + len(pieces)])
+            offset += len(pieces)
+            prefix = f"ch{i + 1}-"
+            chapters.append(
+                f'<div class="chapter">\n{self._prefix_ids(parsed.html, prefix)}\n</div>'
+            )
+            tocs.append(self._prefix_ids(parsed.toc, prefix))
+
+        return chapters, self._merge_tocs(tocs)
+
+    def read_files(
+        self, file_paths: List[Path], dedup: Optional[Deduplicator] = None
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Read markdown files, returning their contents and filenames.
+
+        With dedup, date sections and commits already seen in an earlier
+        file are dropped (see dedupe()).
+        """
         contents = []
         filenames = []
 
         for path in file_paths:
             if path.exists():
-                contents.append(path.read_text(encoding="utf-8"))
+                content = self.prepare_source(path.read_text(encoding="utf-8"))
+                contents.append(content if dedup is None else self.dedupe(content, dedup))
                 filenames.append(path.name)
 
-        return self.combine_contents(contents, filenames, mode)
+        return contents, filenames
+
+    def dedupe(self, content: str, dedup: Deduplicator) -> str:
+        """
+        Drop the date sections and commits of content that dedup saw in an earlier file.
+
+        Content before the first date header is kept; content with nothing
+        dropped is returned as is.
+        """
+        dedup.start_file()
+        index = self.index_sections(content)
+        kept = []
+        changed = False
+        for section in index.sections:
+            text = index.section_text(section)
+            deduped = dedup.section(text)
+            changed = changed or deduped is not text
+            if deduped is not None:
+                kept.append(deduped)
+
+        if not changed:
+            return content
+        parts = [] if index.lead is None else [index.lead]
+        return '\n'.join(parts + kept)
+
+    def prepare_source(self, content: str) -> str:
+        """Markdown of an uploaded file; raw git logs become the report skeleton."""
+        if settings.gitlog_auto_convert and is_git_log(content):
+            return gitlog_parser.convert(content.split("\n"))
+        return content
+
+    def prepare_date_range(self, content: str, start: date, end: date) -> Optional[str]:
+        """
+        prepare_source() cut to the date sections from start to end.
 
+        Raw git logs are converted from the commits in range only, so their
+        summary and statistics count just those. None means nothing is in range.
+        """
+        if settings.gitlog_auto_convert and is_git_log(content):
+            return gitlog_parser.convert(content.split("\n"), start, end) or None
+        return self.select_date_range(content, start, end)
 
     # Indonesian month names mapping
     MONTH_MAP = {
@@ -132,89 +842,153 @@ class MarkdownParser:
         Returns datetime object or None if not a date header.
         """
         # Pattern: ## DD Month YYYY or # DD Month YYYY
-        pattern = r'#+ (\d{1,2})\s+(\w+)\s+(\d{4})'
-        match = re.search(pattern, header, re.IGNORECASE)
+        match = HEADER_DATE_RE.search(header)
 
         if match:
-            day = int(match.group(1))
-            month_name = match.group(2).lower()
-            year = int(match.group(3))
-
-            month = self.MONTH_MAP.get(month_name)
-            if month:
-                try:
-                    return datetime(year, month, day)
-                except ValueError:
-                    return None
+            return self._make_date(match.group(1), match.group(2), match.group(3))
         return None
 
-    def _extract_sections_by_date(self, content: str) -> Tuple[List[str], List[Tuple[Optional[datetime], str, str]]]:
-        """
-        Extract sections from markdown based on date headers.
-        Returns list of (date, header_line, section_content) tuples.
+    def _make_date(self, day: str, month_name: str, year: str) -> Optional[datetime]:
+        """Build a date from header parts, None for unknown months or invalid days."""
+        month = self.MONTH_MAP.get(month_name.lower())
+        if month:
+            try:
+                return datetime(int(year), month, int(day))
+            except ValueError:
+                return None
+        return None
+
+    def index_sections(self, content: str) -> SectionIndex:
         """
-        lines = content.split('\n')
-        sections = []
-        current_header = None
-        current_date = None
-        current_lines = []
-        header_before_dates = []
-        found_first_date = False
+        Index the date sections of markdown content in a single pass.
 
-        for line in lines:
-            # Check if this is a date header (## or # followed by date)
-            if re.match(r'^#{1,2}\s+\d{1,2}\s+\w+\s+\d{4}', line):
-                # Save previous section if exists
-                if current_header is not None:
-                    sections.append((current_date, current_header, '\n'.join(current_lines)))
-
-                found_first_date = True
-                current_header = line
-                current_date = self._parse_date_from_header(line)
-                current_lines = []
-            elif not found_first_date:
-                # Content before any date header (like title, summary)
-                header_before_dates.append(line)
-            else:
-                current_lines.append(line)
-
-        # Don't forget the last section
-        if current_header is not None:
-            sections.append((current_date, current_header, '\n'.join(current_lines)))
-
-        return header_before_dates, sections
+        A date header is a "#" or "##" line starting with a date; each
+        section runs until the next date header.
+        """
+        sections: List[DateSection] = []
+        for match in DATE_HEADER_RE.finditer(content):
+            if sections:
+                sections[-1].end = match.start() - 1
+            sections.append(DateSection(self._header_date(match), match.start(), match.end(), len(content)))
+        return SectionIndex(content, sections)
+
+    def parse_date_header(self, line: str) -> Tuple[bool, Optional[datetime]]:
+        """Whether a single line is a date header, and its date (None if unreadable)."""
+        match = DATE_HEADER_RE.match(line) if line.startswith("#") else None
+        return (False, None) if match is None else (True, self._header_date(match))
+
+    def _header_date(self, match: re.Match) -> Optional[datetime]:
+        """Date of a DATE_HEADER_RE match, as _parse_date_from_header() reads it."""
+        if match.group("sep") == " ":
+            return self._make_date(match.group("day"), match.group("month"), match.group("year"))
+        # Rare spacing; the date pattern may then match elsewhere on the line
+        return self._parse_date_from_header(match.group(0))
 
     def sort_by_date(self, content: str) -> str:
         """
         Sort markdown content chronologically by date headers.
         Dates are sorted from oldest to newest (e.g., 22 Dec → 23 Dec → 24 Dec).
         """
-        header_before_dates, sections = self._extract_sections_by_date(content)
+        index = self.index_sections(content)
 
         # If no date sections found, return original content
-        if not sections:
+        if not index.sections:
             return content
 
-        # Sort sections by date (oldest first, None dates at the end)
-        sorted_sections = sorted(
-            sections,
-            key=lambda x: (x[0] is None, x[0] if x[0] else datetime.max)
-        )
+        ordered = index.sorted_sections()
+
+        # Already in order with nothing to drop: the result is the input
+        if all(a is b for a, b in zip(ordered, index.sections)) and all(
+            section.header_end >= section.end or index.has_body(section) for section in ordered
+        ):
+            return content
+
+        # Header content (title, summary, etc.) first, then the sorted sections
+        parts = [] if index.lead is None else [index.lead]
+        parts.extend(index.section_text(section) for section in ordered)
+        return '\n'.join(parts)
+
+    def _match_selector(self, selector: str):
+        """
+        Turn a section selector into a predicate over (date, header).
+
+        Accepts an ISO date ("2025-12-23"), a header date ("23 Desember 2025")
+        or any other text, which is matched against the header line.
+        """
+        try:
+            wanted = datetime.strptime(selector.strip(), "%Y-%m-%d")
+        except ValueError:
+            wanted = self._parse_date_from_header(f"## {selector.strip()}")
+
+        if wanted is not None:
+            return lambda date, header: date == wanted
 
-        # Rebuild the markdown
-        result_parts = []
+        needle = selector.strip().lower()
+        return lambda date, header: needle in header.lower()
+
+    def select_sections(self, content: str, selector: str) -> Optional[str]:
+        """
+        Keep only the date sections matching a selector.
+
+        Content before the first date header is dropped. Returns None when
+        no section matches.
+        """
+        index = self.index_sections(content)
+        matches = self._match_selector(selector)
+
+        parts = [
+            index.section_text(section)
+            for section in index.sections
+            if matches(section.date, index.header(section))
+        ]
+
+        return '\n'.join(parts) if parts else None
+
+    def select_date_range(self, content: str, start: date, end: date) -> Optional[str]:
+        """
+        Keep only the date sections from start to end, inclusive.
+
+        Content without any date section is returned unchanged; otherwise
+        content before the first date header is dropped, as in
+        select_sections(). Returns None when no section is in range.
+        """
+        index = self.index_sections(content)
+        if not index.sections:
+            return content
+
+        parts = [
+            index.section_text(section)
+            for section in index.sections
+            if section.date is not None and start <= section.date.date() <= end
+        ]
+        return '\n'.join(parts) if parts else None
+
+    def truncate(self, content: str, max_chars: int) -> str:
+        """
+        Cut markdown to roughly max_chars at a blank line.
+
+        Never cuts inside a fenced code block, so the slice parses the same
+        way it does as part of the whole document.
+        """
+        if len(content) <= max_chars:
+            return content
+
+        length = 0
+        in_fence = False
+        lines = content.split('\n')
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith(("```", "~~~")):
+                in_fence = not in_fence
+            elif not line.strip() and not in_fence and length >= max_chars:
+                return '\n'.join(lines[:i])
+            length += len(line) + 1
 
-        # Add header content (title, summary, etc.) first
-        if header_before_dates:
-            result_parts.append('\n'.join(header_before_dates))
+        return content
 
-        # Add sorted date sections
-        for date, header, section_content in sorted_sections:
-            result_parts.append(header)
-            if section_content.strip():
-                result_parts.append(section_content)
 
-        return '\n'.join(result_parts)
+def _convert_fragments(pieces: List[str]) -> List[ParsedFragment]:
+    """Parse pieces of markdown inside a parse worker process."""
+    return [markdown_parser._convert_fragment(piece) for piece in pieces]
 
 
 # Singleton instance
@@ -0,0 +1,187 @@
+"""Lightweight in-process metrics exposed in Prometheus text format."""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Bytes
+SIZE_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(10))  # 1KB .. 256MB
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    """Format a bucket bound without losing precision ("0.005", "1024.0")."""
+    return repr(float(bound))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Format a Prometheus label set."""
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative histogram with optional labels."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation."""
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labels, key, f'le="{_format_bound(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        """Increment the counter."""
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        """Render in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+# A collector returns (name, type, help, value) samples computed at scrape time
+Collector = Callable[[], List[Tuple[str, str, str, float]]]
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders them for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Collector] = []
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help, labels, buckets)
+        return self._metrics[name]
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help, labels)
+        return self._metrics[name]
+
+    def register_collector(self, collector: Collector):
+        """Register a callback that reports values at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            for name, metric_type, help, value in collector():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "report_stage_seconds", "Wall time per report pipeline stage", ["stage"]
+)
+stage_cpu_seconds = metrics.histogram(
+    "report_stage_cpu_seconds", "CPU time per report pipeline stage", ["stage"]
+)
+stage_input_bytes = metrics.histogram(
+    "report_stage_input_bytes", "Input size per report pipeline stage", ["stage"], SIZE_BUCKETS
+)
+request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency per route", ["method", "route", "status"]
+)
+markdown_pool_wait = metrics.histogram(
+    "markdown_pool_wait_seconds", "Time spent waiting for a pooled Markdown instance"
+)
+worker_recycles = metrics.counter(
+    "render_worker_recycles_total", "Render worker processes replaced", ["reason"]
+)
+duplicates_dropped = metrics.counter(
+    "report_duplicates_dropped_total", "Commits or date sections repeated across uploaded files and left out"
+)
+
+
+def record_stage(name: str, wall: float, cpu: float, input_size: Optional[int] = None):
+    """Record a pipeline stage measured elsewhere (e.g. in a render worker)."""
+    stage_seconds.observe(wall, stage=name)
+    stage_cpu_seconds.observe(cpu, stage=name)
+    if input_size is not None:
+        stage_input_bytes.observe(input_size, stage=name)
+
+
+@contextmanager
+def stage(name: str, input_size: Optional[int] = None) -> Iterator[None]:
+    """Time a pipeline stage (wall and CPU time of the current thread)."""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        record_stage(
+            name,
+            time.perf_counter() - wall_start,
+            time.thread_time() - cpu_start,
+            input_size,
+        )
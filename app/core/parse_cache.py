@@ -0,0 +1,191 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import markdown
+
+from app.config import settings
+
+# Bump when the parser's HTML output changes, so stale disk entries miss
+FORMAT_VERSION = 2
+
+
+@dataclass
+class ParsedFragment:
+    """HTML of one independently parsed piece of markdown."""
+    html: str
+    toc_tokens: List[Dict[str, Any]]  # Flat, in document order: level, id, name
+    header_ids: List[str]             # Ids of all headings, in document order
+
+    @property
+    def size(self) -> int:
+        return len(self.html) + sum(len(token["name"]) for token in self.toc_tokens)
+
+
+class ParseCache:
+    """
+    Cache of parsed markdown fragments keyed by a hash of their source.
+
+    Entries live in a size-bounded in-memory LRU. The optional disk tier
+    keeps them across restarts; it is bounded by total size and evicts the
+    least recently used files first, like the PDF cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.parse_cache_max_size,
+        cache_dir: Path = settings.output_dir / ".parse_cache",
+        disk_enabled: bool = settings.parse_cache_disk,
+        disk_max_size: int = settings.parse_cache_disk_max_size,
+    ):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        self.disk_enabled = disk_enabled
+        self.disk_max_size = disk_max_size
+        self._entries: "OrderedDict[str, ParsedFragment]" = OrderedDict()
+        self._size = 0
+        self._disk_size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_size = sum(path.stat().st_size for path in self.cache_dir.glob("*.json"))
+
+    def make_key(self, text: str) -> str:
+        """Cache key of a markdown source; includes the Markdown and output versions."""
+        digest = hashlib.sha256(f"{markdown.__version__}:{FORMAT_VERSION}".encode("utf-8") + b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the path of a disk entry."""
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[ParsedFragment]:
+        """Look up a fragment in memory, then on disk."""
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return fragment
+
+        if self.disk_enabled:
+            path = self._entry_path(key)
+            try:
+                fragment = ParsedFragment(**json.loads(path.read_text(encoding="utf-8")))
+                path.touch()
+            except (OSError, ValueError, TypeError):
+                fragment = None
+            if fragment is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, fragment)
+                return fragment
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, fragment: ParsedFragment):
+        """Store a fragment in memory and, if enabled, on disk."""
+        self._remember(key, fragment)
+
+        if self.disk_enabled:
+            data = json.dumps(asdict(fragment), ensure_ascii=False).encode("utf-8")
+            path = self._entry_path(key)
+            temp_path = path.with_suffix(".tmp")
+            try:
+                temp_path.write_bytes(data)
+                temp_path.replace(path)
+            except OSError:
+                return  # Silently fail if can't write
+            with self._lock:
+                self._disk_size += len(data)
+                over_limit = self._disk_size > self.disk_max_size
+            if over_limit:
+                self._evict_disk()
+
+    def _remember(self, key: str, fragment: ParsedFragment):
+        """Add a fragment to the memory tier, evicting old entries."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = fragment
+            self._size += fragment.size
+
+            while self._size > self.max_size and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def _evict_disk(self):
+        """Remove least recently used disk entries until under the size limit."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            # Leave some headroom so we don't rescan on every put
+            if total <= self.disk_max_size * 0.9:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+
+        with self._lock:
+            self._disk_size = total
+
+    def clear(self) -> int:
+        """Drop all entries. Returns count of deleted disk files."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+        deleted = 0
+        if self.disk_enabled:
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    path.unlink()
+                    deleted += 1
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_size = 0
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "size": self._size,
+            "max_size": self.max_size,
+            "disk_enabled": self.disk_enabled,
+            "disk_size": self._disk_size,
+        }
+
+
+# Singleton instance
+parse_cache = ParseCache()
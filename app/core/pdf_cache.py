@@ -0,0 +1,193 @@
+import os
+import uuid
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+from app.config import settings
+
+
+class PDFCache:
+    """
+    Disk-backed, content-addressed cache of rendered PDFs.
+
+    Entries are keyed by a hash of the final HTML, the ordered CSS file
+    contents and the template source. The cache is bounded by total size
+    and evicts the least recently used entries first (access time is
+    tracked through the file mtime).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = settings.output_dir / ".pdf_cache",
+        max_size: int = settings.pdf_cache_max_size,
+        enabled: bool = settings.pdf_cache_enabled,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.enabled = enabled
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def make_key(
+        self,
+        html_content: str,
+        css_paths: List[Path],
+        template_path: Optional[Path] = None,
+        variant: str = "",
+    ) -> str:
+        """Build the cache key for a render, variant marks partial renders."""
+        digest = hashlib.sha256()
+        digest.update(html_content.encode("utf-8"))
+
+        for css_path in css_paths:
+            digest.update(b"\0css:" + css_path.name.encode("utf-8") + b"\0")
+            if css_path.exists():
+                digest.update(css_path.read_bytes())
+
+        if template_path is not None and template_path.exists():
+            digest.update(b"\0template\0")
+            digest.update(template_path.read_bytes())
+
+        if variant:
+            digest.update(b"\0variant:" + variant.encode("utf-8"))
+
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the path of a cache entry."""
+        return self.cache_dir / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[Path]:
+        """Look up a cached PDF, marking it as recently used."""
+        if not self.enabled:
+            return None
+
+        path = self._entry_path(key)
+        with self._lock:
+            try:
+                os.utime(path)
+                size = path.stat().st_size
+            except OSError:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.bytes_saved += size
+            return path
+
+    def temp_path(self) -> Path:
+        """Get a scratch path inside the cache directory for a new entry."""
+        return self.cache_dir / f".tmp-{uuid.uuid4().hex}.pdf"
+
+    def put_file(self, key: str, source: Path) -> Path:
+        """Move a rendered PDF into the cache and return the entry path."""
+        path = self._entry_path(key)
+        os.replace(source, path)
+        self._evict(keep=path)
+        return path
+
+    def put_bytes(self, key: str, pdf_bytes: bytes) -> Path:
+        """Store rendered PDF bytes in the cache and return the entry path."""
+        temp_path = self.temp_path()
+        temp_path.write_bytes(pdf_bytes)
+        return self.put_file(key, temp_path)
+
+    def copy_to(self, cached_path: Path, output_path: Path) -> Path:
+        """Copy a cached PDF to its final location."""
+        shutil.copyfile(cached_path, output_path)
+        return output_path
+
+    def link_to(self, cached_path: Path, output_path: Path) -> Path:
+        """
+        Give a cached PDF a second name that survives its eviction.
+
+        Hard-linked when possible, copied otherwise. The entry shares its
+        mtime with the link, so only use this for short-lived files.
+        """
+        try:
+            os.link(cached_path, output_path)
+        except OSError:
+            shutil.copyfile(cached_path, output_path)  # Raises FileNotFoundError once evicted
+        return output_path
+
+    def _evict(self, keep: Optional[Path] = None):
+        """
+        Remove least recently used entries until under the size limit.
+
+        The keep entry (the one just stored) is never removed, even when it
+        alone exceeds the limit, since the caller is about to serve it.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*.pdf"):
+                if path.name.startswith(".tmp-"):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self) -> int:
+        """Remove all cache entries. Returns count of deleted files."""
+        deleted = 0
+        with self._lock:
+            for path in self.cache_dir.glob("*.pdf"):
+                if path.name.startswith(".tmp-"):
+                    continue  # A render being stored right now
+                try:
+                    path.unlink()
+                    deleted += 1
+                except OSError:
+                    pass
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        entries = 0
+        size = 0
+        for path in self.cache_dir.glob("*.pdf"):
+            if path.name.startswith(".tmp-"):
+                continue
+            try:
+                size += path.stat().st_size
+            except OSError:
+                continue
+            entries += 1
+
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": entries,
+            "size": size,
+            "max_size": self.max_size,
+        }
+
+
+# Singleton instance
+pdf_cache = PDFCache()
@@ -1,10 +1,145 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from io import BytesIO
 from weasyprint import HTML, CSS
+from weasyprint.document import Document
 from weasyprint.text.fonts import FontConfiguration
 
 from app.config import settings
+from app.core.metrics import record_stage, worker_recycles
+
+
+# (mtime_ns, size) of a stylesheet file, None if it does not exist
+FileSignature = Optional[Tuple[int, int]]
+
+_PAGES_COUNTER_RE = re.compile(r"counter\(\s*pages\s*\)")
+_FIRST_PAGE_RE = re.compile(r"@page\s*:first\b")
+
+
+class StylesheetCache:
+    """
+    Caches parsed WeasyPrint stylesheets per file and per ordered combination.
+    Entries are invalidated when a file's mtime or size changes.
+    """
+
+    def __init__(self, font_config: FontConfiguration):
+        self.font_config = font_config
+        self.hits = 0
+        self.misses = 0
+        self._files: Dict[Path, Tuple[FileSignature, CSS]] = {}
+        self._combinations: Dict[Tuple[Path, ...], Tuple[Tuple[FileSignature, ...], List[CSS]]] = {}
+        self._variants: Dict[tuple, Tuple[Tuple[FileSignature, ...], List[CSS]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _signature(path: Path) -> FileSignature:
+        """Get the (mtime, size) signature of a file."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load_file(self, path: Path, signature: FileSignature) -> CSS:
+        """Get a parsed stylesheet for one file, parsing it if stale."""
+        cached = self._files.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        stylesheet = CSS(filename=str(path), font_config=self.font_config)
+        self._files[path] = (signature, stylesheet)
+        return stylesheet
+
+    def get(self, css_paths: List[Path]) -> List[CSS]:
+        """Get parsed stylesheets for an ordered list of CSS files."""
+        key = tuple(css_paths)
+        signatures = tuple(self._signature(path) for path in css_paths)
+
+        with self._lock:
+            cached = self._combinations.get(key)
+            if cached and cached[0] == signatures:
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            stylesheets = [
+                self._load_file(path, signature)
+                for path, signature in zip(css_paths, signatures)
+                if signature is not None
+            ]
+            self._combinations[key] = (signatures, stylesheets)
+            return stylesheets
+
+    def get_stitched(
+        self,
+        css_paths: List[Path],
+        keep_first_page: bool,
+        total_pages: int,
+    ) -> List[CSS]:
+        """
+        Get stylesheets rewritten for a segment of a stitched document.
+
+        ``counter(pages)`` is replaced by the known total of the stitched
+        document and, for segments after the first, ``@page :first`` rules
+        are disabled since their first page is not the document's first.
+        """
+        key = (tuple(css_paths), keep_first_page, total_pages)
+        signatures = tuple(self._signature(path) for path in css_paths)
+
+        with self._lock:
+            cached = self._variants.get(key)
+            if cached and cached[0] == signatures:
+                self.hits += 1
+                return cached[1]
+
+            self.misses += 1
+            stylesheets = []
+            for path, signature in zip(css_paths, signatures):
+                if signature is None:
+                    continue
+                css_text = path.read_text(encoding="utf-8")
+                css_text = _PAGES_COUNTER_RE.sub(f'"{total_pages}"', css_text)
+                if not keep_first_page:
+                    css_text = _FIRST_PAGE_RE.sub("@page stitched-segment", css_text)
+                stylesheets.append(
+                    CSS(string=css_text, base_url=str(path), font_config=self.font_config)
+                )
+
+            # Variants depend on the page total, keep only the most recent ones
+            if len(self._variants) >= 64:
+                self._variants.pop(next(iter(self._variants)))
+            self._variants[key] = (signatures, stylesheets)
+            return stylesheets
+
+    def clear(self):
+        """Drop all cached stylesheets."""
+        with self._lock:
+            self._files.clear()
+            self._combinations.clear()
+            self._variants.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "files": len(self._files),
+            "combinations": len(self._combinations),
+        }
 
 
 class PDFGenerator:
@@ -14,62 +149,84 @@ class PDFGenerator:
         self.css_dir = css_dir
         self.css_dir.mkdir(parents=True, exist_ok=True)
         self.font_config = FontConfiguration()
+        self.stylesheet_cache = StylesheetCache(self.font_config)
 
     def _load_stylesheets(self, css_files: List[str]) -> List[CSS]:
-        """Load CSS files as WeasyPrint stylesheets."""
-        stylesheets = []
+        """Load CSS files as WeasyPrint stylesheets (cached by file mtime)."""
+        return self.stylesheet_cache.get([self.css_dir / css_file for css_file in css_files])
 
-        for css_file in css_files:
-            css_path = self.css_dir / css_file
-            if css_path.exists():
-                stylesheets.append(
-                    CSS(filename=str(css_path), font_config=self.font_config)
-                )
-
-        return stylesheets
-
-    def generate(
+    def render(
         self,
         html_content: str,
-        output_path: Path,
         css_files: Optional[List[str]] = None,
         base_url: Optional[str] = None,
-    ) -> Path:
-        """Generate PDF from HTML and save to file."""
+    ) -> Document:
+        """Lay out HTML into a WeasyPrint Document without serializing it."""
         if css_files is None:
             css_files = ["default.css"]
 
         stylesheets = self._load_stylesheets(css_files)
 
         html = HTML(string=html_content, base_url=base_url)
-        html.write_pdf(
-            output_path,
+        return html.render(
             stylesheets=stylesheets,
             font_config=self.font_config,
         )
 
-        return output_path
-
-    def generate_bytes(
+    def render_segment(
         self,
         html_content: str,
-        css_files: Optional[List[str]] = None,
-        base_url: Optional[str] = None,
-    ) -> bytes:
-        """Generate PDF from HTML and return as bytes."""
+        css_files: Optional[List[str]],
+        base_url: Optional[str],
+        start_page: int,
+        total_pages: int,
+    ) -> Document:
+        """Lay out one segment of a stitched document with global page numbers."""
         if css_files is None:
             css_files = ["default.css"]
 
-        stylesheets = self._load_stylesheets(css_files)
+        stylesheets = self.stylesheet_cache.get_stitched(
+            [self.css_dir / css_file for css_file in css_files],
+            keep_first_page=start_page == 1,
+            total_pages=total_pages,
+        )
+        if start_page > 1:
+            stylesheets = stylesheets + [
+                CSS(string=f"@page :first {{ counter-reset: page {start_page} }}")
+            ]
 
         html = HTML(string=html_content, base_url=base_url)
-        pdf_buffer = BytesIO()
-        html.write_pdf(
-            pdf_buffer,
+        return html.render(
             stylesheets=stylesheets,
             font_config=self.font_config,
         )
 
+    def write_document(self, document: Document, output_path: Path) -> Path:
+        """Serialize an already laid-out Document to a PDF file."""
+        document.write_pdf(output_path)
+        return output_path
+
+    def generate(
+        self,
+        html_content: str,
+        output_path: Path,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+    ) -> Path:
+        """Generate PDF from HTML and save to file."""
+        document = self.render(html_content, css_files, base_url)
+        return self.write_document(document, output_path)
+
+    def generate_bytes(
+        self,
+        html_content: str,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+    ) -> bytes:
+        """Generate PDF from HTML and return as bytes."""
+        document = self.render(html_content, css_files, base_url)
+        pdf_buffer = BytesIO()
+        document.write_pdf(pdf_buffer)
         return pdf_buffer.getvalue()
 
     def list_styles(self) -> List[str]:
@@ -82,3 +239,413 @@ class PDFGenerator:
 
 # Singleton instance
 pdf_generator = PDFGenerator()
+
+
+class DocumentStore:
+    """
+    Short-lived store of laid-out Documents keyed by render token.
+
+    Bounded by the total number of stored pages (a proxy for memory) and
+    by age, so a preview's layout can be reused when the same report is
+    generated shortly afterwards.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = settings.render_store_max_pages,
+        ttl_seconds: int = settings.render_store_ttl_seconds,
+    ):
+        self.max_pages = max_pages
+        self.ttl_seconds = ttl_seconds
+        self._documents: "OrderedDict[str, Tuple[float, Document]]" = OrderedDict()
+        self._pages = 0
+
+    def _expire(self):
+        """Drop expired entries, then oldest entries while over the page budget."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        for token in list(self._documents):
+            stored_at, document = self._documents[token]
+            if stored_at < cutoff or self._pages > self.max_pages:
+                del self._documents[token]
+                self._pages -= len(document.pages)
+
+    def get(self, token: str) -> Optional[Document]:
+        """Get a stored Document, or None if missing or expired."""
+        self._expire()
+        entry = self._documents.get(token)
+        if entry is None:
+            return None
+        self._documents.move_to_end(token)
+        return entry[1]
+
+    def put(self, token: str, document: Document):
+        """Store a Document under a render token."""
+        if len(document.pages) > self.max_pages:
+            return
+        previous = self._documents.pop(token, None)
+        if previous is not None:
+            self._pages -= len(previous[1].pages)
+        self._documents[token] = (time.monotonic(), document)
+        self._pages += len(document.pages)
+        self._expire()
+
+
+# Per-process store used inside render workers
+document_store = DocumentStore()
+
+
+@dataclass
+class RenderResult:
+    """Result of a render job executed in a worker process."""
+    output_path: Optional[Path] = None
+    pdf_bytes: Optional[bytes] = None
+    page_count: int = 0
+    reused_document: bool = False
+    reused_segments: int = 0
+    worker_pid: int = 0
+    worker_rss: int = 0  # Resident set size of the worker after the job, in bytes
+    stylesheet_stats: Optional[Dict[str, int]] = None
+    # stage -> (wall seconds, cpu seconds, input bytes), measured in the worker
+    timings: Dict[str, Tuple[float, float, int]] = field(default_factory=dict)
+
+
+def _current_rss() -> int:
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Peak rather than current RSS, still a usable ceiling signal
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def _measure(result: RenderResult, stage: str, input_size: int = 0):
+    """Accumulate wall/CPU time of a stage into the render result."""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall, cpu, size = result.timings.get(stage, (0.0, 0.0, 0))
+        result.timings[stage] = (
+            wall + time.perf_counter() - wall_start,
+            cpu + time.thread_time() - cpu_start,
+            size + input_size,
+        )
+
+
+def _render_job(
+    html_content: str,
+    css_files: Optional[List[str]],
+    base_url: Optional[str],
+    output_path: Optional[Path],
+    render_token: Optional[str],
+    max_pages: Optional[int] = None,
+) -> RenderResult:
+    """Render a PDF inside a worker process using its own PDFGenerator."""
+    result = RenderResult(worker_pid=os.getpid())
+
+    document = document_store.get(render_token) if render_token else None
+    if document is None:
+        with _measure(result, "weasyprint_layout", len(html_content)):
+            document = pdf_generator.render(html_content, css_files, base_url)
+        if render_token:
+            document_store.put(render_token, document)
+    else:
+        result.reused_document = True
+
+    if max_pages and len(document.pages) > max_pages:
+        document = document.copy(document.pages[:max_pages])
+
+    result.page_count = len(document.pages)
+    with _measure(result, "pdf_write"):
+        if output_path is None:
+            pdf_buffer = BytesIO()
+            document.write_pdf(pdf_buffer)
+            result.pdf_bytes = pdf_buffer.getvalue()
+        else:
+            result.output_path = pdf_generator.write_document(document, output_path)
+
+    result.stylesheet_stats = pdf_generator.stylesheet_cache.stats()
+    result.worker_rss = _current_rss()
+    return result
+
+
+# Per-process caches of laid-out chapter segments and their page counts
+segment_store = DocumentStore(ttl_seconds=settings.chapter_cache_ttl_seconds)
+segment_page_counts: "OrderedDict[str, int]" = OrderedDict()
+
+
+def _render_segments_job(
+    segments: List[str],
+    css_files: Optional[List[str]],
+    base_url: Optional[str],
+    output_path: Path,
+    render_token: Optional[str],
+) -> RenderResult:
+    """
+    Render a chaptered report segment by segment and stitch the pages.
+
+    Segments are cached by content hash together with their first page
+    number and the document's page total, so an edit that does not change
+    any chapter's page count only re-lays out the edited chapter.
+    """
+    result = RenderResult(worker_pid=os.getpid())
+
+    stitched = document_store.get(render_token) if render_token else None
+    if stitched is not None:
+        result.reused_document = True
+        result.page_count = len(stitched.pages)
+        with _measure(result, "pdf_write"):
+            result.output_path = pdf_generator.write_document(stitched, output_path)
+        result.stylesheet_stats = pdf_generator.stylesheet_cache.stats()
+        result.worker_rss = _current_rss()
+        return result
+
+    hashes = [hashlib.sha256(segment.encode("utf-8")).hexdigest() for segment in segments]
+
+    # 1. Page count of every segment (laid out once for segments never seen)
+    for segment, segment_hash in zip(segments, hashes):
+        if segment_hash not in segment_page_counts:
+            with _measure(result, "weasyprint_layout", len(segment)):
+                document = pdf_generator.render(segment, css_files, base_url)
+            segment_page_counts[segment_hash] = len(document.pages)
+        segment_page_counts.move_to_end(segment_hash)
+    while len(segment_page_counts) > 1000:
+        segment_page_counts.popitem(last=False)
+
+    counts = [segment_page_counts[segment_hash] for segment_hash in hashes]
+    total_pages = sum(counts)
+
+    # 2. Lay out segments with their final page numbers, reusing cached ones
+    documents = []
+    start_page = 1
+    for segment, segment_hash, count in zip(segments, hashes, counts):
+        key = f"{segment_hash}:{start_page}:{total_pages}"
+        document = segment_store.get(key)
+        if document is None:
+            with _measure(result, "weasyprint_layout", len(segment)):
+                document = pdf_generator.render_segment(
+                    segment, css_files, base_url, start_page, total_pages
+                )
+            segment_store.put(key, document)
+        else:
+            result.reused_segments += 1
+        documents.append(document)
+        start_page += count
+
+    # 3. Stitch the pages; bookmarks and internal links span all of them
+    all_pages = [page for document in documents for page in document.pages]
+    stitched = documents[0].copy(all_pages)
+    if render_token:
+        document_store.put(render_token, stitched)
+
+    result.page_count = len(all_pages)
+    with _measure(result, "pdf_write"):
+        result.output_path = pdf_generator.write_document(stitched, output_path)
+    result.stylesheet_stats = pdf_generator.stylesheet_cache.stats()
+    result.worker_rss = _current_rss()
+    return result
+
+
+# Affinity keys whose holding lane is remembered
+LANE_HOLDERS_MAX = 4096
+
+
+class RenderPool:
+    """
+    Runs WeasyPrint renders on a bounded pool of worker processes.
+
+    Each worker is a single-process lane. A render carrying a render token
+    goes back to the lane that last rendered that token, so a Document
+    laid out for a preview is found again by the matching generate call.
+    Other renders go to the token's hashed lane when it is idle, else to
+    the least busy lane.
+
+    WeasyPrint, fontconfig and Pillow hold on to memory across renders, so
+    a lane's worker is recycled after max_renders jobs or once its RSS
+    passes max_rss. The old worker finishes its in-flight jobs before it
+    exits; new jobs already go to the replacement.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.render_workers,
+        max_renders: int = settings.render_worker_max_renders,
+        max_rss: int = settings.render_worker_max_rss_mb * 1024 * 1024,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_renders = max_renders
+        self.max_rss = max_rss
+        self._lanes: List[Optional[ProcessPoolExecutor]] = [None] * self.max_workers
+        self._in_flight: List[int] = [0] * self.max_workers
+        self._renders: List[int] = [0] * self.max_workers
+        # Lane that last rendered each affinity key (and so holds its stored document)
+        self._holders: "OrderedDict[str, int]" = OrderedDict()
+        self.recycles = 0
+        # Latest stylesheet cache counters reported by each worker process
+        self._worker_stylesheet_stats: Dict[int, Dict[str, int]] = {}
+
+    def _get_lane(self, index: int) -> ProcessPoolExecutor:
+        """Start a lane's worker process on first use."""
+        if self._lanes[index] is None:
+            # Spawn instead of fork: the server process may hold threads and
+            # fontconfig state that is not safe to inherit.
+            self._lanes[index] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._lanes[index]
+
+    def _recycle(self, index: int, lane: ProcessPoolExecutor, reason: str):
+        """Replace a lane's worker, letting the old one drain in the background."""
+        if self._lanes[index] is not lane:
+            return  # Already replaced by a concurrent job
+
+        self._lanes[index] = None
+        self._renders[index] = 0
+        for key in [key for key, held in self._holders.items() if held == index]:
+            del self._holders[key]
+        self.recycles += 1
+        worker_recycles.inc(reason=reason)
+        # Queued and running jobs still complete on the old worker
+        lane.shutdown(wait=False)
+
+    def _pick_lane(self, affinity_key: Optional[str]) -> int:
+        """
+        Pick the lane holding the key's document, else the key's hashed lane
+        if it is idle, else the least busy lane.
+        """
+        if affinity_key:
+            held = self._holders.get(affinity_key)
+            if held is not None:
+                return held
+            hashed = int(hashlib.sha1(affinity_key.encode("utf-8")).hexdigest()[:8], 16) % self.max_workers
+            if self._in_flight[hashed] == 0:
+                return hashed
+        return min(range(self.max_workers), key=lambda i: self._in_flight[i])
+
+    def _remember_holder(self, affinity_key: Optional[str], index: int):
+        """Record the lane that now holds a key's document."""
+        if not affinity_key:
+            return
+        self._holders[affinity_key] = index
+        self._holders.move_to_end(affinity_key)
+        while len(self._holders) > LANE_HOLDERS_MAX:
+            self._holders.popitem(last=False)
+
+    async def _submit(self, affinity_key: Optional[str], job, *args) -> RenderResult:
+        """Run a render job on a lane and collect its worker statistics."""
+        index = self._pick_lane(affinity_key)
+        loop = asyncio.get_running_loop()
+
+        lane = self._get_lane(index)
+        self._in_flight[index] += 1
+        try:
+            result = await loop.run_in_executor(lane, partial(job, *args))
+        except BrokenProcessPool:
+            # The worker died (e.g. killed for memory), start a fresh one
+            self._recycle(index, lane, "crashed")
+            raise
+        finally:
+            self._in_flight[index] -= 1
+
+        if result.stylesheet_stats is not None:
+            self._worker_stylesheet_stats[result.worker_pid] = result.stylesheet_stats
+        if self._lanes[index] is lane:
+            self._remember_holder(affinity_key, index)
+            self._renders[index] += 1
+            if self.max_rss and result.worker_rss > self.max_rss:
+                self._recycle(index, lane, "memory")
+            elif self.max_renders and self._renders[index] >= self.max_renders:
+                self._recycle(index, lane, "renders")
+        for stage, (wall, cpu, input_size) in result.timings.items():
+            record_stage(stage, wall, cpu, input_size or None)
+        return result
+
+    async def render(
+        self,
+        html_content: str,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        output_path: Optional[Path] = None,
+        render_token: Optional[str] = None,
+        max_pages: Optional[int] = None,
+    ) -> RenderResult:
+        """Render HTML in a worker, writing to output_path or returning bytes."""
+        return await self._submit(
+            render_token, _render_job,
+            html_content, css_files, base_url, output_path, render_token, max_pages,
+        )
+
+    async def render_segments(
+        self,
+        segments: List[str],
+        output_path: Path,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        render_token: Optional[str] = None,
+        affinity_key: Optional[str] = None,
+    ) -> RenderResult:
+        """
+        Render a chaptered report incrementally and write the stitched PDF.
+
+        Use an affinity_key that stays stable across edits of the same
+        report so its renders reach the lane holding its cached chapters.
+        """
+        return await self._submit(
+            affinity_key or render_token,
+            _render_segments_job, segments, css_files, base_url, output_path, render_token,
+        )
+
+    async def generate(
+        self,
+        html_content: str,
+        output_path: Path,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        render_token: Optional[str] = None,
+        max_pages: Optional[int] = None,
+    ) -> Path:
+        """Generate PDF in a worker process and save to file."""
+        result = await self.render(
+            html_content, css_files, base_url, output_path, render_token, max_pages
+        )
+        return result.output_path
+
+    async def generate_bytes(
+        self,
+        html_content: str,
+        css_files: Optional[List[str]] = None,
+        base_url: Optional[str] = None,
+        render_token: Optional[str] = None,
+    ) -> bytes:
+        """Generate PDF in a worker process and return as bytes."""
+        result = await self.render(html_content, css_files, base_url, None, render_token)
+        return result.pdf_bytes
+
+    def stylesheet_stats(self) -> Dict[str, int]:
+        """Get stylesheet cache hit/miss counters summed over all workers."""
+        totals = {"hits": 0, "misses": 0}
+        for stats in self._worker_stylesheet_stats.values():
+            totals["hits"] += stats["hits"]
+            totals["misses"] += stats["misses"]
+        return totals
+
+    def shutdown(self):
+        """Stop the worker processes, waiting for in-flight renders."""
+        for index, lane in enumerate(self._lanes):
+            if lane is not None:
+                lane.shutdown(wait=True)
+                self._lanes[index] = None
+
+
+# Singleton instance
+render_pool = RenderPool()
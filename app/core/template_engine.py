@@ -1,8 +1,17 @@
+import os
+import time
 from datetime import date
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from dataclasses import dataclass, field
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    TemplateError,
+    select_autoescape,
+)
 
 from app.config import settings
 
@@ -31,15 +40,63 @@ class ReportVariables:
     show_toc: bool = True
     images: List[ImageInfo] = field(default_factory=list)  # List of images to include
     next_week_plan: str = ""  # Rencana kerja minggu depan
+    start_date: str = ""  # YYYY-MM-DD; when set, the report only covers sections from start to end
+    end_date: str = ""
 
-    def set_date_range(self, start_date: str, end_date: str):
-        """Set date range from provided dates (YYYY-MM-DD format)."""
+    def set_date_range(self, start_date: str, end_date: str, filter_content: bool = False):
+        """
+        Set date range from provided dates (YYYY-MM-DD format).
+
+        With filter_content the report is also cut to the date sections in
+        that range; otherwise only the period shown in the header is set.
+        """
         from datetime import datetime
         start = datetime.strptime(start_date, "%Y-%m-%d")
         end = datetime.strptime(end_date, "%Y-%m-%d")
+        self.set_period(start.date(), end.date())
+        if filter_content:
+            self.start_date = start.date().isoformat()
+            self.end_date = end.date().isoformat()
+
+    def set_period(self, start: date, end: date):
+        """Set only the period shown in the header; the content is not cut."""
         self.week_start_date = start.strftime("%B %d, %Y")
         self.week_end_date = end.strftime("%B %d, %Y")
 
+    @property
+    def date_range(self) -> Optional[Tuple[date, date]]:
+        """First and last day the report covers, if set."""
+        if not (self.start_date and self.end_date):
+            return None
+        return date.fromisoformat(self.start_date), date.fromisoformat(self.end_date)
+
+
+# Placeholder rendered in place of the content when splitting into segments
+CONTENT_MARKER = "<!--report-content-marker-->"
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "source", "track", "wbr",
+}
+
+
+class _OpenTagTracker(HTMLParser):
+    """Tracks which elements are still open at the end of an HTML prefix."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack: List[tuple] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.stack.append((tag, self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                del self.stack[i:]
+                break
+
 
 @dataclass
 class TemplateInfo:
@@ -53,15 +110,98 @@ class TemplateInfo:
 class TemplateEngine:
     """Handles Jinja2 template rendering for reports."""
 
-    def __init__(self, template_dir: Path = settings.templates_dir):
+    def __init__(
+        self,
+        template_dir: Path = settings.templates_dir,
+        bytecode_dir: Optional[Path] = settings.output_dir / ".jinja_cache" if settings.template_bytecode_cache else None,
+        auto_reload: bool = settings.template_auto_reload or settings.debug,
+        generation_file: Path = settings.output_dir / ".template_generation",
+        reload_check_seconds: float = settings.template_reload_check_seconds,
+    ):
         self.template_dir = template_dir
         self.template_dir.mkdir(parents=True, exist_ok=True)
+        self.auto_reload = auto_reload
+        # Replaced by reload(); every process sharing it drops its loaded
+        # templates, looking for a change at most every reload_check_seconds
+        self.generation_file = generation_file
+        self.reload_check_seconds = reload_check_seconds
+        self._generation = self._read_generation()
+        self._generation_checked = time.monotonic()
 
+        bytecode_cache = None
+        if bytecode_dir is not None:
+            bytecode_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_dir))
+
+        # Without auto_reload templates are not re-stat'ed on every render;
+        # reload() picks up changed files
         self.env = Environment(
             loader=FileSystemLoader(template_dir),
             autoescape=select_autoescape(["html", "xml"]),
+            bytecode_cache=bytecode_cache,
+            auto_reload=auto_reload,
         )
 
+    def precompile(self) -> List[str]:
+        """
+        Load every template so the first render doesn't compile it.
+
+        Compiled code comes from the bytecode cache when another process
+        already compiled the same source. Returns the names loaded; broken
+        templates are skipped (rendering them reports the error).
+        """
+        loaded = []
+        for name in self.env.list_templates(extensions=["html"]):
+            try:
+                self.env.get_template(name)
+            except TemplateError as e:
+                print(f"Skipping template {name}: {e}")
+                continue
+            loaded.append(name)
+        return loaded
+
+    def _read_generation(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.generation_file)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _check_generation(self):
+        """Drop loaded templates when any process has reloaded since they were loaded."""
+        if self.auto_reload:
+            return  # Jinja2 already checks every template file
+        now = time.monotonic()
+        if now - self._generation_checked < self.reload_check_seconds:
+            return
+        self._generation_checked = now
+        generation = self._read_generation()
+        if generation != self._generation:
+            self._generation = generation
+            if self.env.cache is not None:
+                self.env.cache.clear()
+
+    def reload(self) -> List[str]:
+        """
+        Forget loaded templates and load them again from disk.
+
+        The generation file is touched so other worker processes reload on
+        their next render too.
+        """
+        try:
+            # Replaced rather than rewritten: a new inode marks the change even on coarse mtimes
+            self.generation_file.parent.mkdir(parents=True, exist_ok=True)
+            staged = self.generation_file.with_name(f"{self.generation_file.name}.{os.getpid()}")
+            staged.write_text(str(time.time_ns()), encoding="utf-8")
+            os.replace(staged, self.generation_file)
+        except OSError:
+            pass  # Only this process reloads
+        self._generation = self._read_generation()
+        self._generation_checked = time.monotonic()
+        if self.env.cache is not None:
+            self.env.cache.clear()
+        return self.precompile()
+
     def render_report(
         self,
         template_name: str,
@@ -76,6 +216,7 @@ class TemplateEngine:
         variables.content = content
         variables.toc = toc
 
+        self._check_generation()
         template = self.env.get_template(template_name)
 
         return template.render(
@@ -93,6 +234,45 @@ class TemplateEngine:
             next_week_plan=variables.next_week_plan,
         )
 
+    def render_segments(
+        self,
+        template_name: str,
+        chapters: List[str],
+        toc: str = "",
+        variables: Optional[ReportVariables] = None,
+    ) -> List[str]:
+        """
+        Render the report as standalone HTML documents, one per chapter.
+
+        The first segment holds the cover, TOC and first chapter, the last
+        one also holds everything after the content (images, plan, footer).
+        Every segment repeats the template's <head> and the wrappers around
+        the content, so it lays out like the same part of the full report.
+        """
+        html = self.render_report(template_name, CONTENT_MARKER, toc, variables)
+        before, _, after = html.partition(CONTENT_MARKER)
+
+        if len(chapters) < 2:
+            return [before + "".join(chapters) + after]
+
+        tracker = _OpenTagTracker()
+        tracker.feed(before)
+
+        head_end = before.find("</head>")
+        head = before[before.find("<head"):head_end + len("</head>")] if head_end != -1 else ""
+
+        skeleton = ["<!DOCTYPE html>"]
+        for tag, start_tag in tracker.stack:
+            skeleton.append(start_tag)
+            if tag == "html":
+                skeleton.append(head)
+        wrapper = "".join(skeleton)
+
+        segments = [before + chapters[0]]
+        segments.extend(wrapper + chapter for chapter in chapters[1:-1])
+        segments.append(wrapper + chapters[-1] + after)
+        return segments
+
     def list_templates(self) -> List[TemplateInfo]:
         """List available templates."""
         templates = []
@@ -1,13 +1,25 @@
+import time
+import signal
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.core.file_manager import file_manager
+from app.core.highlight import highlight_cache
 from app.core.image_manager import image_manager
-from app.api.routes import upload, templates, reports, preview, images, ai
+from app.core.markdown_parser import markdown_parser
+from app.core.metrics import metrics, request_seconds
+from app.core.pdf_cache import pdf_cache
+from app.core.parse_cache import parse_cache
+from app.core.pdf_generator import render_pool
+from app.core.template_engine import template_engine
+from app.services.job_service import job_service
+from app.services.report_service import report_service
+from app.api.routes import upload, templates, reports, preview, images, ai, gitlog
 
 
 @asynccontextmanager
@@ -15,12 +27,29 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print(f"Starting {settings.app_name}...")
+    deleted_batches = report_service.cleanup_old_batches()
+    if deleted_batches:
+        print(f"Deleted {deleted_batches} old batch ZIP(s)")
+    print(f"Precompiled {len(template_engine.precompile())} template(s)")
+    try:
+        # `kill -HUP` reloads changed templates
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, template_engine.reload)
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        pass  # No SIGHUP (Windows) or not on the main thread
+    await job_service.start()
     yield
     # Shutdown
+    await job_service.stop()
+    render_pool.shutdown()
+    markdown_parser.shutdown()
     print("Cleaning up old files...")
     deleted_files = file_manager.cleanup_old_files()
     deleted_images = image_manager.cleanup_old_images()
-    print(f"Deleted {deleted_files} old file(s) and {deleted_images} old image(s)")
+    deleted_batches = report_service.cleanup_old_batches()
+    print(
+        f"Deleted {deleted_files} old file(s), {deleted_images} old image(s) "
+        f"and {deleted_batches} old batch ZIP(s)"
+    )
 
 
 app = FastAPI(
@@ -39,6 +68,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record request latency per matched route."""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    request_seconds.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    return response
+
+
+def _collect_runtime_metrics():
+    """Cache, stylesheet and queue gauges reported at scrape time."""
+    cache = pdf_cache.stats()
+    samples = [
+        ("pdf_cache_hits_total", "counter", "PDF cache hits", cache["hits"]),
+        ("pdf_cache_misses_total", "counter", "PDF cache misses", cache["misses"]),
+        ("pdf_cache_bytes_saved_total", "counter", "Bytes served from the PDF cache", cache["bytes_saved"]),
+    ]
+
+    parse = parse_cache.stats()
+    samples.extend([
+        ("parse_cache_hits_total", "counter", "Markdown sections served from the parse cache", parse["hits"] + parse["disk_hits"]),
+        ("parse_cache_misses_total", "counter", "Markdown sections parsed", parse["misses"]),
+    ])
+
+    highlight = highlight_cache.stats()
+    samples.extend([
+        ("highlight_cache_hits_total", "counter", "Code blocks and language guesses served from cache", highlight["hits"]),
+        ("highlight_cache_misses_total", "counter", "Code block cache misses", highlight["misses"]),
+        ("highlight_lexer_guesses_total", "counter", "Pygments lexer guesses run", highlight["guesses"]),
+    ])
+
+    for key, value in render_pool.stylesheet_stats().items():
+        samples.append((
+            f"stylesheet_cache_{key}_total", "counter",
+            f"Stylesheet cache {key} across render workers", value,
+        ))
+
+    pool = markdown_parser.pool.stats()
+    samples.extend([
+        ("markdown_pool_size", "gauge", "Markdown instances available for parsing", pool["size"]),
+        ("markdown_pool_in_use", "gauge", "Markdown instances currently parsing", pool["in_use"]),
+    ])
+
+    for lane, length in job_service.queue_lengths().items():
+        samples.append((f"report_jobs_queued_{lane}", "gauge", f"Queued {lane} report jobs", length))
+    return samples
+
+
+metrics.register_collector(_collect_runtime_metrics)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory=settings.static_dir), name="static")
 app.mount("/uploads/images", StaticFiles(directory=settings.images_dir), name="images")
@@ -50,6 +136,7 @@ app.include_router(templates.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
 app.include_router(preview.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
+app.include_router(gitlog.router, prefix="/api")
 
 
 @app.get("/")
@@ -64,6 +151,12 @@ async def health_check():
     return {"status": "healthy", "app": settings.app_name}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
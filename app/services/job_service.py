@@ -0,0 +1,252 @@
+"""Background job queue for report generation with status polling."""
+
+import json
+import uuid
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+from app.core.markdown_parser import CombineMode
+from app.core.template_engine import ReportVariables
+from app.services.report_service import report_service
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a report job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class JobPriority(str, Enum):
+    """Queue lane of a report job."""
+    INTERACTIVE = "interactive"  # A user is waiting for this one
+    BULK = "bulk"                # Scripted / batch generation
+
+
+@dataclass
+class ReportJob:
+    """A queued report generation request and its outcome."""
+    job_id: str
+    priority: JobPriority
+    params: Dict[str, Any]  # Keyword arguments for ReportService.generate_report
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    report_id: Optional[str] = None
+    filename: Optional[str] = None
+    size: Optional[int] = None
+    duplicates_dropped: Optional[int] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the state file."""
+        data = asdict(self)
+        data["priority"] = self.priority.value
+        data["status"] = self.status.value
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = data[key].isoformat() if data[key] else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ReportJob":
+        """Deserialize from the state file."""
+        data = dict(data)
+        data["priority"] = JobPriority(data["priority"])
+        data["status"] = JobStatus(data["status"])
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = datetime.fromisoformat(data[key]) if data[key] else None
+        return cls(**data)
+
+
+class JobService:
+    """
+    Runs report generation jobs on a pool of async workers.
+
+    Interactive jobs are always taken before bulk jobs, and when there is
+    more than one worker the first one only takes interactive jobs, so a
+    user never waits behind a queue of bulk renders. Job state is persisted
+    to a JSON file so queued work survives a restart.
+    """
+
+    def __init__(
+        self,
+        state_file: Path = settings.output_dir / "jobs.json",
+        workers: int = settings.job_workers,
+    ):
+        self.state_file = state_file
+        self.workers = max(1, workers)
+        self.jobs: Dict[str, ReportJob] = {}
+        self._queues: Dict[JobPriority, Deque[str]] = {
+            JobPriority.INTERACTIVE: deque(),
+            JobPriority.BULK: deque(),
+        }
+        self._available: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self._load_state()
+
+    def _load_state(self):
+        """Load persisted jobs, re-queueing anything that had not finished."""
+        if not self.state_file.exists():
+            return
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+
+        cutoff = datetime.now() - timedelta(hours=settings.file_max_age_hours)
+        for record in records:
+            try:
+                job = ReportJob.from_dict(record)
+            except (KeyError, TypeError, ValueError):
+                continue
+
+            if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+                # Interrupted by a restart: run it again
+                job.status = JobStatus.QUEUED
+                job.started_at = None
+                self._queues[job.priority].append(job.job_id)
+            elif job.created_at < cutoff:
+                continue
+
+            self.jobs[job.job_id] = job
+
+    def _save_state(self):
+        """Persist all jobs to the state file."""
+        try:
+            temp_file = self.state_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump([job.to_dict() for job in self.jobs.values()], f, indent=2)
+            temp_file.replace(self.state_file)
+        except IOError:
+            pass  # Silently fail if can't write
+
+    async def start(self):
+        """Start the worker tasks."""
+        self._available = asyncio.Condition()
+        self._tasks = [
+            asyncio.create_task(self._worker(interactive_only=(i == 0 and self.workers > 1)))
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Stop the worker tasks. Running jobs are re-queued on next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._save_state()
+
+    async def submit(
+        self,
+        file_ids: List[str],
+        image_ids: Optional[List[str]] = None,
+        template_name: str = "default_report.html",
+        css_files: Optional[List[str]] = None,
+        variables: Optional[ReportVariables] = None,
+        combine_mode: CombineMode = CombineMode.SEQUENTIAL,
+        priority: JobPriority = JobPriority.BULK,
+    ) -> ReportJob:
+        """Queue a report for generation and return the job immediately."""
+        if variables is None:
+            variables = ReportVariables()
+
+        # Content, TOC and images are filled in by the pipeline
+        variables_data = {
+            key: value
+            for key, value in asdict(variables).items()
+            if key not in ("content", "toc", "images")
+        }
+
+        job = ReportJob(
+            job_id=str(uuid.uuid4()),
+            priority=priority,
+            params={
+                "file_ids": file_ids,
+                "image_ids": image_ids or [],
+                "template_name": template_name,
+                "css_files": css_files or ["default.css"],
+                "variables": variables_data,
+                "combine_mode": combine_mode.value,
+            },
+        )
+        self.jobs[job.job_id] = job
+        self._queues[priority].append(job.job_id)
+        self._save_state()
+
+        if self._available is not None:
+            async with self._available:
+                self._available.notify_all()
+        return job
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        """Get a job by ID."""
+        return self.jobs.get(job_id)
+
+    def queue_lengths(self) -> Dict[str, int]:
+        """Number of queued jobs per lane."""
+        return {priority.value: len(queue) for priority, queue in self._queues.items()}
+
+    def _take_next(self, interactive_only: bool) -> Optional[ReportJob]:
+        """Pop the next job a worker may run, interactive lane first."""
+        lanes = [JobPriority.INTERACTIVE] if interactive_only else [JobPriority.INTERACTIVE, JobPriority.BULK]
+        for lane in lanes:
+            if self._queues[lane]:
+                return self.jobs[self._queues[lane].popleft()]
+        return None
+
+    async def _worker(self, interactive_only: bool):
+        """Take jobs off the queue and run them until cancelled."""
+        while True:
+            async with self._available:
+                job = self._take_next(interactive_only)
+                while job is None:
+                    await self._available.wait()
+                    job = self._take_next(interactive_only)
+
+            await self._run(job)
+
+    async def _run(self, job: ReportJob):
+        """Run a single job and record its outcome."""
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now()
+        self._save_state()
+
+        params = job.params
+
+        try:
+            report = await report_service.generate_report(
+                file_ids=params["file_ids"],
+                image_ids=params["image_ids"],
+                template_name=params["template_name"],
+                css_files=params["css_files"],
+                variables=ReportVariables(**params["variables"]),
+                combine_mode=CombineMode(params["combine_mode"]),
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        else:
+            job.status = JobStatus.DONE
+            job.report_id = report.report_id
+            job.filename = report.filename
+            job.size = report.size
+            job.duplicates_dropped = report.duplicates_dropped
+
+        job.finished_at = datetime.now()
+        self._save_state()
+
+
+# Singleton instance
+job_service = JobService()
@@ -1,15 +1,26 @@
+import json
+import time
 import uuid
+import asyncio
+import threading
+import zipfile
 from pathlib import Path
-from datetime import datetime
-from typing import List, Optional
-from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import settings
 from app.core.file_manager import file_manager
 from app.core.image_manager import image_manager
+from app.core.dedup import Deduplicator
 from app.core.markdown_parser import markdown_parser, CombineMode
+from app.core.parse_cache import parse_cache, ParsedFragment
 from app.core.template_engine import template_engine, ReportVariables, ImageInfo
-from app.core.pdf_generator import pdf_generator
+from app.core.pdf_generator import pdf_generator, render_pool
+from app.core.pdf_cache import pdf_cache
+from app.core.metrics import duplicates_dropped, stage
 
 
 @dataclass
@@ -20,6 +31,77 @@ class GeneratedReport:
     file_path: Path
     size: int
     generated_at: datetime
+    duplicates_dropped: int = 0  # Repeated commits or sections left out of the report
+
+
+@dataclass
+class PreviewPDF:
+    """A rendered PDF preview on disk."""
+    render_token: str
+    file_path: Path
+    is_temporary: bool = False  # Delete after it has been streamed
+
+
+@dataclass
+class ReportSpec:
+    """Inputs for one report of a batch."""
+    file_ids: List[str]
+    image_ids: List[str] = field(default_factory=list)
+    template_name: str = "default_report.html"
+    css_files: List[str] = field(default_factory=lambda: ["default.css"])
+    variables: ReportVariables = field(default_factory=ReportVariables)
+    combine_mode: CombineMode = CombineMode.SEQUENTIAL
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a batch generation."""
+    batch_id: str
+    manifest: List[Dict[str, Any]]  # One entry per spec, in request order
+    zip_path: Path
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for entry in self.manifest if entry["status"] == "done")
+
+    @property
+    def failed(self) -> int:
+        return len(self.manifest) - self.succeeded
+
+
+@dataclass
+class PreparedReport:
+    """Final report HTML, ready to be rendered to PDF."""
+    html_content: str
+    segments: Optional[List[str]] = None  # Per-chapter documents for incremental rendering
+    affinity_key: Optional[str] = None
+    max_pages: Optional[int] = None  # Keep only the first pages (partial preview)
+    duplicates_dropped: int = 0  # Repeated commits or sections left out of the report
+
+
+@dataclass
+class LivePreview:
+    """Result of a live preview update."""
+    session_id: str
+    full: bool                   # html holds the whole document, otherwise a patch
+    order: List[str]             # Section ids in document order
+    html: Optional[str] = None
+    sections: Dict[str, str] = field(default_factory=dict)  # New or changed sections (patch)
+    toc: Optional[str] = None    # New TOC when it changed (patch)
+
+
+@dataclass
+class PreviewSession:
+    """What a live preview client currently shows."""
+    context_key: str                     # Template, variables, images and combine mode
+    fragments: Dict[str, ParsedFragment]  # Parsed sections by parse cache key
+    sections: Dict[str, str]             # Section HTML by section id
+    toc: str
+    last_used: float = field(default_factory=time.monotonic)
+
+
+# Rough amount of markdown that fills an A4 page, used to size partial previews
+PREVIEW_CHARS_PER_PAGE = 3000
 
 
 class ReportService:
@@ -28,27 +110,324 @@ class ReportService:
     def __init__(self):
         self.output_dir = settings.output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.spool_dir = self.output_dir / ".spool"
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_dir = self.output_dir / "batches"
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        self._preview_sessions: "OrderedDict[str, PreviewSession]" = OrderedDict()
+        self._preview_lock = threading.Lock()
 
     def _load_images(self, image_ids: List[str]) -> List[ImageInfo]:
         """Load image information for the given image IDs."""
         images = []
+        # Get metadata from image_manager's list
+        all_images = {img.image_id: img for img in image_manager.list_images()}
         for image_id in image_ids:
-            path = image_manager.get_image_path(image_id)
-            if path and path.exists():
-                # Get metadata from image_manager's list
-                all_images = image_manager.list_images()
-                for img in all_images:
-                    if img.image_id == image_id:
-                        images.append(ImageInfo(
-                            image_id=img.image_id,
-                            title=img.title,
-                            url=image_manager.get_image_url(image_id),
-                            file_path=str(path.absolute()),
-                        ))
-                        break
+            img = all_images.get(image_id)
+            if img is None:
+                continue
+
+            # Embed the print-resolution derivative rather than the raw upload
+            path = image_manager.get_print_path(image_id)
+            images.append(ImageInfo(
+                image_id=img.image_id,
+                title=img.title,
+                url=image_manager.get_image_url(image_id),
+                file_path=str(path.absolute()),
+            ))
         return images
 
-    def generate_report(
+    def _cache_key(
+        self,
+        html_content: str,
+        template_name: str,
+        css_files: List[str],
+        max_pages: Optional[int] = None,
+    ) -> str:
+        """Build the PDF cache key for a rendered report."""
+        return pdf_cache.make_key(
+            html_content=html_content,
+            css_paths=[pdf_generator.css_dir / css_file for css_file in css_files],
+            template_path=template_engine.template_dir / template_name,
+            variant=f"first-{max_pages}-pages" if max_pages else "",
+        )
+
+    def _get_file_paths(self, file_ids: List[str]) -> List[Path]:
+        """Resolve uploaded file IDs to paths, skipping missing files."""
+        file_paths = []
+        for file_id in file_ids:
+            path = file_manager.get_file_path(file_id)
+            if path and path.exists():
+                file_paths.append(path)
+
+        if not file_paths:
+            raise ValueError("No valid files found for the provided file IDs")
+
+        return file_paths
+
+    def _fill_period(self, variables: ReportVariables, file_ids: List[str]):
+        """Show the period the files cover, from their upload stats, when none was set."""
+        if variables.week_start_date or variables.week_end_date:
+            return
+        stats = [file_manager.get_stats(file_id) for file_id in file_ids]
+        first_dates = [s.first_date for s in stats if s and s.first_date]
+        last_dates = [s.last_date for s in stats if s and s.last_date]
+        if first_dates:
+            variables.set_period(date.fromisoformat(min(first_dates)), date.fromisoformat(max(last_dates)))
+
+    def _date_range(self, variables: ReportVariables) -> Optional[Tuple[date, date]]:
+        """Days the report's markdown is cut to, if any."""
+        return variables.date_range if settings.date_range_filter else None
+
+    def _read_files(
+        self,
+        file_paths: List[Path],
+        variables: ReportVariables,
+        dedup: Optional[Deduplicator] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Read markdown files, keeping only the date sections in the report's range.
+
+        With a date range only the byte ranges of the matching sections are
+        read (see FileManager.read_date_range); files with nothing in range
+        are left out.
+        """
+        date_range = self._date_range(variables)
+        if date_range is None:
+            return markdown_parser.read_files(file_paths, dedup)
+
+        contents = []
+        filenames = []
+        for path in file_paths:
+            content = file_manager.read_date_range(path.stem, *date_range)
+            if content is not None:
+                contents.append(content if dedup is None else markdown_parser.dedupe(content, dedup))
+                filenames.append(path.name)
+
+        if not contents:
+            start, end = date_range
+            raise ValueError(f"No sections between {start.isoformat()} and {end.isoformat()}")
+        return contents, filenames
+
+    def _record_duplicates(self, dedup: Optional[Deduplicator]) -> int:
+        """Count what a deduplicator dropped in the metrics and return it."""
+        dropped = dedup.dropped if dedup is not None else 0
+        if dropped:
+            duplicates_dropped.inc(dropped)
+        return dropped
+
+    def _slice(
+        self,
+        contents: List[str],
+        filenames: List[str],
+        section: Optional[str],
+        max_pages: Optional[int],
+    ) -> Tuple[List[str], List[str]]:
+        """Cut markdown down to the part a partial preview shows."""
+        if section:
+            selected = [
+                (markdown_parser.select_sections(content, section), filename)
+                for content, filename in zip(contents, filenames)
+            ]
+            selected = [(content, filename) for content, filename in selected if content is not None]
+            if not selected:
+                raise ValueError(f"No section matches '{section}'")
+            contents = [content for content, _ in selected]
+            filenames = [filename for _, filename in selected]
+
+        if max_pages:
+            # Enough text to fill the pages; the render trims the overshoot
+            budget = max_pages * PREVIEW_CHARS_PER_PAGE
+            sliced = []
+            for content in contents:
+                if budget <= 0:
+                    break
+                sliced.append(markdown_parser.truncate(content, budget))
+                budget -= len(sliced[-1])
+            contents, filenames = sliced, filenames[:len(sliced)]
+
+        return contents, filenames
+
+    def _prepare(
+        self,
+        file_ids: List[str],
+        image_ids: List[str],
+        template_name: str,
+        variables: ReportVariables,
+        combine_mode: CombineMode,
+        segmented: bool = False,
+        section: Optional[str] = None,
+        max_pages: Optional[int] = None,
+    ) -> PreparedReport:
+        """
+        Run the pipeline up to the final HTML.
+
+        Pipeline: MD files -> Combine -> Sort -> Parse -> Template
+
+        With section or max_pages only that slice of the markdown goes
+        through parsing and layout (partial preview). A date range in the
+        variables cuts every file to the sections in that range first.
+        Date sections and commits repeated across files are kept once.
+        """
+        # 1. Get file paths from IDs
+        file_paths = self._get_file_paths(file_ids)
+        input_size = sum(path.stat().st_size for path in file_paths)
+        dedup = Deduplicator() if settings.dedupe_sections else None
+
+        # 2. Load images, fill in the period if not given
+        variables.images = self._load_images(image_ids)
+        self._fill_period(variables, [path.stem for path in file_paths])
+
+        # 3. Chaptered reports are parsed chapter by chapter
+        if combine_mode == CombineMode.CHAPTERED:
+            with stage("combine", input_size=input_size):
+                contents, filenames = self._read_files(file_paths, variables, dedup)
+            if section or max_pages:
+                contents, filenames = self._slice(contents, filenames, section, max_pages)
+            with stage("markdown_parse", input_size=sum(len(c) for c in contents)):
+                chapters, toc = markdown_parser.parse_chapters(contents, filenames)
+
+            with stage("template_render"):
+                html_content = template_engine.render_report(
+                    template_name=template_name,
+                    content="\n\n".join(chapters),
+                    toc=toc,
+                    variables=variables,
+                )
+
+            segments = None
+            if segmented and settings.incremental_chapters and len(chapters) > 1:
+                with stage("template_render"):
+                    segments = template_engine.render_segments(
+                        template_name=template_name,
+                        chapters=chapters,
+                        toc=toc,
+                        variables=variables,
+                    )
+
+            # Original filenames stay the same when a log is edited and re-uploaded
+            affinity_key = "|".join(
+                [template_name] + [file_manager.filename_mapping.get(path.stem, path.name) for path in file_paths]
+            )
+            return PreparedReport(
+                html_content, segments=segments, affinity_key=affinity_key, max_pages=max_pages,
+                duplicates_dropped=self._record_duplicates(dedup),
+            )
+
+        if section or max_pages:
+            # 4. Combine markdown files
+            with stage("combine", input_size=input_size):
+                contents, filenames = self._read_files(file_paths, variables, dedup)
+                combined_md = markdown_parser.combine_contents(contents, filenames, combine_mode)
+
+            # 4.5 Auto-sort by date (chronological order: oldest → newest)
+            with stage("date_sort", input_size=len(combined_md)):
+                combined_md = markdown_parser.sort_by_date(combined_md)
+
+            [combined_md], _ = self._slice([combined_md], [""], section, max_pages)
+
+            # 5. Parse to HTML
+            with stage("markdown_parse", input_size=len(combined_md)):
+                parsed = markdown_parser.parse(combined_md)
+        elif self._date_range(variables):
+            # 4-5. Read only the sections in range, then sort and parse them on cached fragments
+            with stage("combine", input_size=input_size):
+                contents, filenames = self._read_files(file_paths, variables, dedup)
+            with stage("markdown_parse", input_size=sum(len(c) for c in contents)):
+                parsed = markdown_parser.parse_combined(contents, filenames, combine_mode)
+        else:
+            # 4-5. Stream, sort and parse files on cached per-section HTML fragments
+            with stage("combine", input_size=input_size):
+                spool = markdown_parser.spool_files(file_paths, combine_mode, dedup=dedup)
+            with spool:
+                with stage("date_sort", input_size=spool.size):
+                    spool.sort()
+                with stage("markdown_parse", input_size=spool.size):
+                    parsed = markdown_parser.parse_spool(spool)
+
+        # 6. Render template with variables
+        with stage("template_render", input_size=len(parsed.html)):
+            html_content = template_engine.render_report(
+                template_name=template_name,
+                content=parsed.html,
+                toc=parsed.toc,
+                variables=variables,
+            )
+        return PreparedReport(
+            html_content, max_pages=max_pages, duplicates_dropped=self._record_duplicates(dedup)
+        )
+
+    async def _render(
+        self,
+        prepared: PreparedReport,
+        css_files: List[str],
+        cache_key: str,
+        output_path: Path,
+    ) -> Path:
+        """Render prepared HTML to a PDF file on the render pool."""
+        # Use base_url for resolving images
+        base_url = str(settings.base_dir.absolute())
+
+        if prepared.segments:
+            await render_pool.render_segments(
+                segments=prepared.segments,
+                output_path=output_path,
+                css_files=css_files,
+                base_url=base_url,
+                render_token=cache_key,
+                affinity_key=prepared.affinity_key,
+            )
+            return output_path
+
+        return await render_pool.generate(
+            html_content=prepared.html_content,
+            output_path=output_path,
+            css_files=css_files,
+            base_url=base_url,
+            render_token=cache_key,
+            max_pages=prepared.max_pages,
+        )
+
+    async def _render_pdf(
+        self,
+        prepared: PreparedReport,
+        template_name: str,
+        css_files: List[str],
+        output_path: Optional[Path] = None,
+    ) -> PreviewPDF:
+        """
+        Get the PDF for prepared HTML, from the cache or by rendering it.
+
+        Writes to output_path when given, otherwise returns a temporary
+        spool file: a link to the cache entry, so evicting the entry can't
+        cut short a response that is still streaming it.
+        """
+        cache_key = self._cache_key(
+            prepared.html_content, template_name, css_files, prepared.max_pages
+        )
+
+        # Reuse an identical earlier render (e.g. the preview) when possible
+        cached_path = pdf_cache.get(cache_key)
+        if cached_path is None and pdf_cache.enabled:
+            temp_path = await self._render(prepared, css_files, cache_key, pdf_cache.temp_path())
+            cached_path = pdf_cache.put_file(cache_key, temp_path)
+
+        spool_path = self.spool_dir / f"{uuid.uuid4().hex}.pdf"
+        if cached_path is not None:
+            try:
+                if output_path is not None:
+                    return PreviewPDF(cache_key, pdf_cache.copy_to(cached_path, output_path))
+                return PreviewPDF(cache_key, pdf_cache.link_to(cached_path, spool_path), is_temporary=True)
+            except FileNotFoundError:
+                pass  # Evicted since the lookup, render it again
+
+        if output_path is not None:
+            return PreviewPDF(cache_key, await self._render(prepared, css_files, cache_key, output_path))
+
+        await self._render(prepared, css_files, cache_key, spool_path)
+        return PreviewPDF(cache_key, spool_path, is_temporary=True)
+
+    async def generate_report(
         self,
         file_ids: List[str],
         image_ids: Optional[List[str]] = None,
@@ -71,37 +450,13 @@ class ReportService:
         if variables is None:
             variables = ReportVariables()
 
-        # 1. Get file paths from IDs
-        file_paths = []
-        for file_id in file_ids:
-            path = file_manager.get_file_path(file_id)
-            if path and path.exists():
-                file_paths.append(path)
-
-        if not file_paths:
-            raise ValueError("No valid files found for the provided file IDs")
-
-        # 2. Load images
-        variables.images = self._load_images(image_ids)
-
-        # 3. Combine markdown files
-        combined_md = markdown_parser.combine_files(file_paths, combine_mode)
-
-        # 3.5 Auto-sort by date (chronological order: oldest → newest)
-        combined_md = markdown_parser.sort_by_date(combined_md)
-
-        # 4. Parse to HTML
-        parsed = markdown_parser.parse(combined_md)
-
-        # 5. Render template with variables
-        html_content = template_engine.render_report(
-            template_name=template_name,
-            content=parsed.html,
-            toc=parsed.toc,
-            variables=variables,
+        # Parsing runs on a worker thread so concurrent requests don't queue
+        prepared = await run_in_threadpool(
+            self._prepare,
+            file_ids, image_ids, template_name, variables, combine_mode, segmented=True,
         )
 
-        # 6. Generate PDF
+        # Generate PDF
         report_id = str(uuid.uuid4())
         safe_title = "".join(
             c if c.isalnum() or c in "- _" else "_"
@@ -110,15 +465,7 @@ class ReportService:
         filename = f"{safe_title}_{report_id[:8]}.pdf"
         output_path = self.output_dir / filename
 
-        # Use base_url for resolving images
-        base_url = str(settings.base_dir.absolute())
-
-        pdf_generator.generate(
-            html_content=html_content,
-            output_path=output_path,
-            css_files=css_files,
-            base_url=base_url,
-        )
+        await self._render_pdf(prepared, template_name, css_files, output_path)
 
         return GeneratedReport(
             report_id=report_id,
@@ -126,6 +473,7 @@ class ReportService:
             file_path=output_path,
             size=output_path.stat().st_size,
             generated_at=datetime.now(),
+            duplicates_dropped=prepared.duplicates_dropped,
         )
 
     def generate_preview_html(
@@ -135,6 +483,7 @@ class ReportService:
         template_name: str = "default_report.html",
         variables: Optional[ReportVariables] = None,
         combine_mode: CombineMode = CombineMode.SEQUENTIAL,
+        section: Optional[str] = None,
     ) -> str:
         """Generate HTML preview without creating PDF."""
         if image_ids is None:
@@ -143,36 +492,172 @@ class ReportService:
         if variables is None:
             variables = ReportVariables()
 
-        # Get file paths
-        file_paths = []
+        prepared = self._prepare(
+            file_ids, image_ids, template_name, variables, combine_mode, section=section
+        )
+        return prepared.html_content
+
+    def _read_live_contents(
+        self,
+        file_ids: List[str],
+        edited: Dict[str, str],
+        date_range: Optional[Tuple[date, date]] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """Markdown of each file, taking edited content over the stored file."""
+        dedup = Deduplicator() if settings.dedupe_sections else None
+        contents = []
+        filenames = []
+        found = False
         for file_id in file_ids:
             path = file_manager.get_file_path(file_id)
-            if path and path.exists():
-                file_paths.append(path)
+            if file_id in edited:
+                if date_range:
+                    content = markdown_parser.prepare_date_range(edited[file_id], *date_range)
+                else:
+                    content = markdown_parser.prepare_source(edited[file_id])
+                filename = path.name if path else f"{file_id}.md"
+            elif path and path.exists():
+                if date_range:
+                    content = file_manager.read_date_range(file_id, *date_range)
+                else:
+                    content = markdown_parser.prepare_source(path.read_text(encoding="utf-8"))
+                filename = path.name
+            else:
+                continue
+
+            found = True
+            if content is not None:
+                contents.append(content if dedup is None else markdown_parser.dedupe(content, dedup))
+                filenames.append(filename)
+
+        if not found:
+            raise ValueError("No valid files found for the provided file IDs")
+        if not contents:
+            start, end = date_range
+            raise ValueError(f"No sections between {start.isoformat()} and {end.isoformat()}")
+        return contents, filenames
+
+    def _get_preview_session(self, session_id: str) -> Optional[PreviewSession]:
+        """Look up a live preview session, dropping expired ones."""
+        ttl = settings.preview_session_ttl_minutes * 60
+        now = time.monotonic()
+        with self._preview_lock:
+            for key in [k for k, s in self._preview_sessions.items() if now - s.last_used > ttl]:
+                del self._preview_sessions[key]
+            session = self._preview_sessions.get(session_id)
+            if session is not None:
+                self._preview_sessions.move_to_end(session_id)
+            return session
+
+    def _store_preview_session(self, session_id: str, session: PreviewSession):
+        """Remember a live preview session, evicting the least recently used."""
+        with self._preview_lock:
+            self._preview_sessions[session_id] = session
+            self._preview_sessions.move_to_end(session_id)
+            while len(self._preview_sessions) > settings.preview_sessions_max:
+                self._preview_sessions.popitem(last=False)
+
+    def end_live_preview(self, session_id: str) -> bool:
+        """Forget a live preview session."""
+        with self._preview_lock:
+            return self._preview_sessions.pop(session_id, None) is not None
+
+    def generate_live_preview(
+        self,
+        file_ids: List[str],
+        session_id: Optional[str] = None,
+        edited: Optional[Dict[str, str]] = None,
+        image_ids: Optional[List[str]] = None,
+        template_name: str = "default_report.html",
+        variables: Optional[ReportVariables] = None,
+        combine_mode: CombineMode = CombineMode.SEQUENTIAL,
+        patch: bool = True,
+    ) -> LivePreview:
+        """
+        Incremental HTML preview for a client that keeps re-requesting it.
 
-        if not file_paths:
-            raise ValueError("No valid files found")
+        The session remembers the parsed date sections it served last time;
+        only sections whose markdown changed are parsed. Each section is
+        wrapped in a div carrying its id, so when the template context is
+        unchanged the client can apply a patch of the changed sections (and
+        the TOC) instead of reloading the whole document.
+        """
+        if combine_mode == CombineMode.CHAPTERED:
+            raise ValueError("Live preview supports sequential and sectioned modes only")
+
+        image_ids = image_ids or []
+        variables = variables or ReportVariables()
+        self._fill_period(variables, file_ids)
+        session_id = session_id or uuid.uuid4().hex
+        previous = self._get_preview_session(session_id)
+
+        contents, filenames = self._read_live_contents(file_ids, edited or {}, self._date_range(variables))
+        pieces = markdown_parser.split_pieces(contents, filenames, combine_mode)
+        keys = [parse_cache.make_key(piece) for piece in pieces]
+
+        # Unchanged sections come from the session, the rest from the cache or the parser
+        known = previous.fragments if previous else {}
+        fragments: List[Optional[ParsedFragment]] = [known.get(key) for key in keys]
+        missing = [i for i, fragment in enumerate(fragments) if fragment is None]
+        with stage("markdown_parse", input_size=sum(len(pieces[i]) for i in missing)):
+            for i, fragment in zip(missing, markdown_parser.parse_fragments([pieces[i] for i in missing])):
+                fragments[i] = fragment
+            section_html, toc = markdown_parser.join_sections(fragments)
+
+        # Identical sections share a key, so number repeats
+        order = []
+        seen: Dict[str, int] = {}
+        for key in keys:
+            seen[key] = seen.get(key, 0) + 1
+            order.append(f"s{key[:16]}" if seen[key] == 1 else f"s{key[:16]}-{seen[key]}")
+        sections = dict(zip(order, section_html))
+
+        context = asdict(variables)
+        for name in ("content", "toc", "images", "generation_date"):
+            context.pop(name)
+        context_key = json.dumps(
+            [template_name, combine_mode.value, image_ids, context], sort_keys=True
+        )
+        self._store_preview_session(session_id, PreviewSession(
+            context_key=context_key,
+            fragments=dict(zip(keys, fragments)),
+            sections=sections,
+            toc=toc,
+        ))
+
+        # A TOC appearing or disappearing changes the page outside the sections
+        if (
+            patch and previous is not None
+            and previous.context_key == context_key
+            and bool(previous.toc) == bool(toc)
+        ):
+            return LivePreview(
+                session_id=session_id,
+                full=False,
+                order=order,
+                sections={
+                    section_id: section
+                    for section_id, section in sections.items()
+                    if previous.sections.get(section_id) != section
+                },
+                toc=toc if toc != previous.toc else None,
+            )
 
-        # Load images
         variables.images = self._load_images(image_ids)
-
-        # Combine and parse markdown
-        combined_md = markdown_parser.combine_files(file_paths, combine_mode)
-
-        # Auto-sort by date (chronological order: oldest → newest)
-        combined_md = markdown_parser.sort_by_date(combined_md)
-
-        parsed = markdown_parser.parse(combined_md)
-
-        # Render template
-        return template_engine.render_report(
-            template_name=template_name,
-            content=parsed.html,
-            toc=parsed.toc,
-            variables=variables,
+        content = "".join(
+            f'<div class="preview-section" data-section="{section_id}">\n{section}</div>\n'
+            for section_id, section in sections.items()
         )
+        with stage("template_render", input_size=len(content)):
+            html_content = template_engine.render_report(
+                template_name=template_name,
+                content=content,
+                toc=toc,
+                variables=variables,
+            )
+        return LivePreview(session_id=session_id, full=True, order=order, html=html_content)
 
-    def generate_preview_pdf(
+    async def generate_preview_pdf(
         self,
         file_ids: List[str],
         image_ids: Optional[List[str]] = None,
@@ -180,35 +665,117 @@ class ReportService:
         css_files: Optional[List[str]] = None,
         variables: Optional[ReportVariables] = None,
         combine_mode: CombineMode = CombineMode.SEQUENTIAL,
-    ) -> bytes:
-        """Generate PDF preview as bytes without saving to file."""
+        section: Optional[str] = None,
+        max_pages: Optional[int] = None,
+    ) -> PreviewPDF:
+        """
+        Generate a PDF preview file to be streamed to the client.
+
+        The laid-out document is kept by the render worker under the
+        returned render token, so generating the same report afterwards
+        only has to serialize it.
+
+        A partial preview (section and/or max_pages) lays out only the
+        selected date sections or the first pages' worth of markdown.
+        """
         if css_files is None:
             css_files = ["default.css"]
 
         if image_ids is None:
             image_ids = []
 
-        html_content = self.generate_preview_html(
-            file_ids=file_ids,
-            image_ids=image_ids,
-            template_name=template_name,
-            variables=variables,
-            combine_mode=combine_mode,
+        if variables is None:
+            variables = ReportVariables()
+
+        partial = bool(section or max_pages)
+        prepared = await run_in_threadpool(
+            self._prepare,
+            file_ids, image_ids, template_name, variables, combine_mode,
+            segmented=not partial, section=section, max_pages=max_pages,
         )
+        return await self._render_pdf(prepared, template_name, css_files)
 
-        # Use base_url for resolving images
-        base_url = str(settings.base_dir.absolute())
+    async def generate_batch(self, specs: List[ReportSpec]) -> BatchResult:
+        """
+        Generate many reports in parallel and bundle them into one ZIP.
 
-        return pdf_generator.generate_bytes(
-            html_content=html_content,
-            css_files=css_files,
-            base_url=base_url,
-        )
+        Renders are spread over all render workers; templates and parsed
+        stylesheets are cached, so the batch shares them. A failing report
+        is recorded in the manifest without stopping the others.
+        """
+        batch_id = str(uuid.uuid4())
+
+        # Enough in flight to keep every render worker busy, without
+        # preparing the HTML of the whole batch up front
+        limit = asyncio.Semaphore(render_pool.max_workers * 2)
+
+        async def run(spec: ReportSpec) -> GeneratedReport:
+            async with limit:
+                return await self.generate_report(
+                    file_ids=spec.file_ids,
+                    image_ids=spec.image_ids,
+                    template_name=spec.template_name,
+                    css_files=spec.css_files,
+                    variables=spec.variables,
+                    combine_mode=spec.combine_mode,
+                )
+
+        results = await asyncio.gather(*(run(spec) for spec in specs), return_exceptions=True)
+
+        manifest = []
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                manifest.append({"index": index, "status": "failed", "error": str(result)})
+            else:
+                manifest.append({
+                    "index": index,
+                    "status": "done",
+                    "report_id": result.report_id,
+                    "filename": result.filename,
+                    "size": result.size,
+                    "duplicates_dropped": result.duplicates_dropped,
+                })
+
+        zip_path = self.batch_dir / f"{batch_id}.zip"
+        reports = [result for result in results if not isinstance(result, Exception)]
+        # Off the event loop: a large archive would stall other requests
+        await run_in_threadpool(self._write_batch_zip, zip_path, reports, manifest)
+
+        return BatchResult(batch_id=batch_id, manifest=manifest, zip_path=zip_path)
+
+    def _write_batch_zip(self, zip_path: Path, reports: List[GeneratedReport], manifest: List[Dict[str, Any]]):
+        """Bundle generated reports and their manifest into a ZIP."""
+        # PDFs are already compressed, store them as-is
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for report in reports:
+                archive.write(report.file_path, arcname=report.filename)
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+    def get_batch_path(self, batch_id: str) -> Optional[Path]:
+        """Get the path to a batch ZIP."""
+        path = self.batch_dir / f"{Path(batch_id).name}.zip"
+        return path if path.exists() else None
+
+    def cleanup_old_batches(self, max_age_hours: int = settings.file_max_age_hours) -> int:
+        """Remove batch ZIPs older than specified age. Returns count of deleted batches."""
+        cutoff = datetime.now() - timedelta(hours=max_age_hours)
+        deleted = 0
+
+        for path in self.batch_dir.glob("*.zip"):
+            mtime = datetime.fromtimestamp(path.stat().st_mtime)
+            if mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+
+        return deleted
 
     def get_report_path(self, report_id: str) -> Optional[Path]:
         """Get the path to a generated report."""
-        for path in self.output_dir.iterdir():
-            if report_id[:8] in path.name:
+        short_id = report_id[:8]
+        if not short_id:
+            return None
+        for path in self.output_dir.glob("*.pdf"):
+            if path.is_file() and path.stem.rsplit("_", 1)[-1] == short_id:
                 return path
         return None
 
@@ -0,0 +1,147 @@
+"""Synthetic git-log markdown corpora for the benchmark suite."""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, ImageDraw
+
+MONTHS_ID = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+
+VERBS = ["Perbaikan", "Penambahan", "Update", "Refactor", "Optimasi", "Validasi"]
+SUBJECTS = [
+    "item topup", "payment confirmation", "order detail sheet", "warehouse",
+    "snackbar overlay", "purchase BRT", "environment config", "login page",
+    "dashboard overview", "laporan harian", "sinkronisasi stok", "notifikasi push",
+]
+AUTHORS = ["vicky maulana", "rina putri", "andi saputra", "dewi lestari"]
+
+CODE_SAMPLE = '''```python
+def apply_bonus(order, items):
+    """Group bonus items unless update_bonus is false."""
+    if not order.get("update_bonus"):
+        return items
+    grouped = {}
+    for item in items:
+        grouped.setdefault(item["sku"], []).append(item)
+    return [group[0] | {"qty": sum(i["qty"] for i in group)} for group in grouped.values()]
+```'''
+
+TABLE_SAMPLE = """| File | Baris Ditambah | Baris Dihapus |
+|------|----------------|---------------|
+| lib/pages/order_detail.dart | 42 | 7 |
+| lib/services/payment.dart | 18 | 3 |
+| lib/widgets/snackbar.dart | 5 | 12 |"""
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+    name: str
+    days: int
+    commits_per_day: int = 8
+    code_fences: bool = False
+    tables: bool = False
+    screenshots: int = 0
+    days_per_file: int = 7  # One uploaded log per week, like the real workflow
+
+
+PRESETS: Dict[str, CorpusSpec] = {
+    "day": CorpusSpec("day", days=1),
+    "week": CorpusSpec("week", days=7),
+    "week-rich": CorpusSpec("week-rich", days=7, code_fences=True, tables=True, screenshots=4),
+    "month": CorpusSpec("month", days=30),
+    "month-rich": CorpusSpec("month-rich", days=30, code_fences=True, tables=True, screenshots=8),
+    "quarter": CorpusSpec("quarter", days=90),
+    "quarter-rich": CorpusSpec("quarter-rich", days=90, code_fences=True, tables=True, screenshots=12),
+}
+
+
+def _date_header(day: datetime) -> str:
+    """Indonesian date header as produced by the AI processor."""
+    return f"## {day.day} {MONTHS_ID[day.month - 1]} {day.year}"
+
+
+def _commit_entry(rng: random.Random, index: int, when: datetime, spec: CorpusSpec) -> str:
+    """One numbered commit entry of a day section."""
+    title = f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)}"
+    lines = [
+        f"### {index}. {title.capitalize()}",
+        f"**Commit:** `{rng.getrandbits(28):07x}`",
+        f"**Author:** {rng.choice(AUTHORS)}",
+        f"**Waktu:** {when:%H:%M}",
+        "",
+        "**Deskripsi:**",
+    ]
+    for _ in range(rng.randint(1, 4)):
+        lines.append(f"- {rng.choice(VERBS)} {rng.choice(SUBJECTS)} pada `{rng.choice(SUBJECTS).replace(' ', '_')}`")
+
+    if spec.code_fences and rng.random() < 0.3:
+        lines.extend(["", CODE_SAMPLE])
+    if spec.tables and rng.random() < 0.2:
+        lines.extend(["", TABLE_SAMPLE])
+
+    lines.extend(["", "---", ""])
+    return "\n".join(lines)
+
+
+def generate_files(spec: CorpusSpec, seed: int = 0) -> List[str]:
+    """
+    Generate the markdown files of a corpus.
+
+    Day sections inside each file are newest first, as in a raw git log,
+    so sort_by_date has real work to do.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 10, 1)
+    files = []
+
+    for file_start in range(0, spec.days, spec.days_per_file):
+        days = range(file_start, min(file_start + spec.days_per_file, spec.days))
+        first, last = start + timedelta(days=days[0]), start + timedelta(days=days[-1])
+        parts = [
+            f"# Changelog - {first.day} sampai {last.day} {MONTHS_ID[last.month - 1]} {last.year}",
+            "",
+            "## Ringkasan Perubahan",
+            "",
+            "Periode ini mencakup perbaikan dan penambahan fitur pada beberapa modul.",
+            "",
+            "---",
+            "",
+        ]
+        for offset in reversed(days):
+            day = start + timedelta(days=offset)
+            parts.extend([_date_header(day), ""])
+            for i in range(spec.commits_per_day):
+                when = day + timedelta(hours=18 - i * 9 / spec.commits_per_day)
+                parts.append(_commit_entry(rng, i + 1, when, spec))
+        files.append("\n".join(parts))
+
+    return files
+
+
+def generate_screenshots(spec: CorpusSpec, directory: Path, seed: int = 0) -> List[Path]:
+    """Write synthetic full-HD PNG screenshots and return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(spec.screenshots):
+        img = Image.new("RGB", (1920, 1080), (245, 246, 250))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((0, 0, 1920, 72), fill=(33, 37, 41))
+        draw.rectangle((0, 72, 280, 1080), fill=(52, 58, 64))
+        for _ in range(40):
+            x, y = rng.randint(300, 1700), rng.randint(100, 980)
+            color = tuple(rng.randint(80, 230) for _ in range(3))
+            draw.rectangle((x, y, x + rng.randint(60, 400), y + rng.randint(20, 120)), fill=color)
+        for line in range(30):
+            draw.text((320, 100 + line * 30), f"Row {line}: {rng.choice(SUBJECTS)}", fill=(20, 20, 20))
+
+        path = directory / f"screenshot_{spec.name}_{i + 1:02d}.png"
+        img.save(path, "PNG")
+        paths.append(path)
+    return paths
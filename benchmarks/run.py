@@ -0,0 +1,337 @@
+"""
+Offline benchmark of the report pipeline.
+
+Usage:
+    python -m benchmarks.run                       # all presets
+    python -m benchmarks.run -c week -c month-rich -n 10 -o before.json
+    python -m benchmarks.run --skip-pdf            # markdown/template stages only
+    python -m benchmarks.run --compare before.json after.json
+
+Everything runs against a throwaway upload/output directory, with the PDF
+cache disabled and without network access or a Gemini key.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Isolate the app from the working tree before anything imports app.config
+_WORKDIR = Path(tempfile.mkdtemp(prefix="report-bench-"))
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ["UPLOAD_DIR"] = str(_WORKDIR / "uploads")
+os.environ["IMAGES_DIR"] = str(_WORKDIR / "uploads" / "images")
+os.environ["OUTPUT_DIR"] = str(_WORKDIR / "output")
+os.environ["PDF_CACHE_ENABLED"] = "false"
+
+from benchmarks.corpus import PRESETS, CorpusSpec, generate_files, generate_screenshots  # noqa: E402
+
+
+def _rss_kb(pid: Any = "self") -> Optional[int]:
+    """Current resident set size of a process in KB, None if unknown."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_pids() -> List[int]:
+    """PIDs of the live render workers."""
+    from app.core.pdf_generator import render_pool
+
+    pids = []
+    for lane in render_pool._lanes:
+        if lane is not None:
+            pids.extend(getattr(lane, "_processes", None) or {})
+    return pids
+
+
+class _RssSampler:
+    """
+    Peak of the summed RSS of this process and its live render workers
+    while one entry point runs, sampled from /proc.
+
+    Without /proc the lifetime peak of this process is reported instead.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> int:
+        own = _rss_kb()
+        if own is None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak // 1024 if sys.platform == "darwin" else peak  # Bytes on macOS
+        return own + sum(_rss_kb(pid) or 0 for pid in _worker_pids())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_kb = max(self.peak_kb, self._sample())
+
+    def __enter__(self) -> "_RssSampler":
+        self.peak_kb = self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kb = max(self.peak_kb, self._sample())
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def _summarize(name: str, corpus: str, samples: List[float], peak_rss_kb: int, input_bytes: int) -> Dict[str, Any]:
+    """Aggregate timing samples of one entry point."""
+    p50 = statistics.median(samples)
+    return {
+        "corpus": corpus,
+        "entry_point": name,
+        "iterations": len(samples),
+        "input_bytes": input_bytes,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "throughput_mb_s": round(input_bytes / p50 / 1e6, 3) if p50 else None,
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+
+def _time_sync(func: Callable[[int], Any], iterations: int, warmup: int) -> Tuple[List[float], int]:
+    """Time a synchronous callable, passing it the iteration number; returns samples and peak RSS."""
+    for i in range(warmup):
+        func(-1 - i)
+    samples = []
+    with _RssSampler() as rss:
+        for i in range(iterations):
+            start = time.perf_counter()
+            func(i)
+            samples.append(time.perf_counter() - start)
+    return samples, rss.peak_kb
+
+
+async def _time_async(func: Callable[[int], Any], iterations: int, warmup: int) -> Tuple[List[float], int]:
+    """Time a coroutine function, passing it the iteration number; returns samples and peak RSS."""
+    for i in range(warmup):
+        await func(-1 - i)
+    samples = []
+    with _RssSampler() as rss:
+        for i in range(iterations):
+            start = time.perf_counter()
+            await func(i)
+            samples.append(time.perf_counter() - start)
+    return samples, rss.peak_kb
+
+
+async def bench_corpus(spec: CorpusSpec, iterations: int, warmup: int, skip_pdf: bool) -> List[Dict[str, Any]]:
+    """Benchmark every pipeline entry point against one corpus."""
+    from app.config import settings
+    from app.core.file_manager import file_manager
+    from app.core.image_manager import image_manager
+    from app.core.markdown_parser import markdown_parser
+    from app.core.pdf_generator import pdf_generator
+    from app.core.template_engine import template_engine, ReportVariables
+    from app.services.report_service import report_service
+
+    contents = generate_files(spec)
+    filenames = [f"git-log-{spec.name}-{i + 1:02d}.md" for i in range(len(contents))]
+    input_bytes = sum(len(content.encode("utf-8")) for content in contents)
+
+    image_ids = []
+    for path in generate_screenshots(spec, settings.images_dir):
+        image_id = path.stem
+        image_manager.create_print_derivative(image_id)
+        image_ids.append(image_id)
+    images = report_service._load_images(image_ids)
+
+    results = []
+
+    def record(name: str, timed: Tuple[List[float], int], size: int):
+        summary = _summarize(name, spec.name, *timed, size)
+        results.append(summary)
+        print(
+            f"  {name:<36} p50 {summary['p50_ms']:>10.2f} ms   p95 {summary['p95_ms']:>10.2f} ms"
+            f"   {summary['throughput_mb_s'] or 0:>8.2f} MB/s   rss {summary['peak_rss_kb'] // 1024} MB"
+        )
+
+    # Intermediate results feed the next stage, as in the real pipeline
+    combined = markdown_parser.combine_contents(contents, filenames)
+    record(
+        "MarkdownParser.combine_contents",
+        _time_sync(lambda i: markdown_parser.combine_contents(contents, filenames), iterations, warmup),
+        input_bytes,
+    )
+
+    sorted_md = markdown_parser.sort_by_date(combined)
+    record(
+        "MarkdownParser.sort_by_date",
+        _time_sync(lambda i: markdown_parser.sort_by_date(combined), iterations, warmup),
+        len(combined.encode("utf-8")),
+    )
+
+    parsed = markdown_parser.parse(sorted_md)
+    record(
+        "MarkdownParser.parse",
+        _time_sync(lambda i: markdown_parser.parse(sorted_md), iterations, warmup),
+        len(sorted_md.encode("utf-8")),
+    )
+
+    def render_template(i: int) -> str:
+        return template_engine.render_report(
+            template_name="default_report.html",
+            content=parsed.html,
+            toc=parsed.toc,
+            variables=ReportVariables(images=images),
+        )
+
+    html_content = render_template(0)
+    record(
+        "TemplateEngine.render_report",
+        _time_sync(render_template, iterations, warmup),
+        len(parsed.html.encode("utf-8")),
+    )
+
+    if skip_pdf:
+        return results
+
+    base_url = str(settings.base_dir.absolute())
+    record(
+        "PDFGenerator.generate_bytes",
+        _time_sync(
+            lambda i: pdf_generator.generate_bytes(html_content, ["default.css"], base_url),
+            iterations,
+            warmup,
+        ),
+        len(html_content.encode("utf-8")),
+    )
+
+    file_ids = [
+        file_manager.save_content(content, filename).file_id
+        for content, filename in zip(contents, filenames)
+    ]
+
+    async def generate(i: int):
+        # A distinct title per run keeps worker-side document reuse out of the numbers
+        report = await report_service.generate_report(
+            file_ids=file_ids,
+            image_ids=image_ids,
+            variables=ReportVariables(report_title=f"Benchmark {spec.name} {i}"),
+        )
+        report_service.delete_report(report.report_id)
+
+    record(
+        "ReportService.generate_report",
+        await _time_async(generate, iterations, warmup),
+        input_bytes,
+    )
+
+    for file_id in file_ids:
+        file_manager.delete_file(file_id)
+    return results
+
+
+def _metadata() -> Dict[str, Any]:
+    """Environment details stored next to the results."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    versions = {}
+    for module in ("markdown", "jinja2", "weasyprint", "PIL"):
+        try:
+            versions[module] = getattr(__import__(module), "__version__", None)
+        except Exception:
+            versions[module] = None
+
+    return {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def compare(baseline_file: Path, current_file: Path) -> None:
+    """Print p50/p95 deltas between two result files."""
+    baseline = json.loads(baseline_file.read_text(encoding="utf-8"))
+    current = json.loads(current_file.read_text(encoding="utf-8"))
+    before = {(r["corpus"], r["entry_point"]): r for r in baseline["results"]}
+
+    print(f"{baseline['meta'].get('commit')} -> {current['meta'].get('commit')}")
+    for result in current["results"]:
+        old = before.get((result["corpus"], result["entry_point"]))
+        if old is None:
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "peak_rss_kb"):
+            change = (result[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            deltas.append(f"{key} {old[key]:>10} -> {result[key]:>10} ({change:+6.1f}%)")
+        print(f"{result['corpus']:<14} {result['entry_point']:<36} " + "   ".join(deltas))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on synthetic corpora.")
+    parser.add_argument("-c", "--corpus", action="append", choices=sorted(PRESETS), help="Corpus preset (repeatable, default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--skip-pdf", action="store_true", help="Skip the WeasyPrint and full pipeline entry points")
+    parser.add_argument("-o", "--output", type=Path, help="Write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASELINE", "CURRENT"), help="Compare two result files and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    async def run_all() -> List[Dict[str, Any]]:
+        from app.core.pdf_generator import render_pool
+
+        results = []
+        try:
+            for name in args.corpus or list(PRESETS):
+                print(f"[{name}]")
+                results.extend(await bench_corpus(PRESETS[name], args.iterations, args.warmup, args.skip_pdf))
+        finally:
+            render_pool.shutdown()
+        return results
+
+    try:
+        report = {"meta": _metadata(), "results": asyncio.run(run_all())}
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
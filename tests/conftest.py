@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Settings are read when app.config is imported; keep the tests off the working tree
+_WORKDIR = tempfile.mkdtemp(prefix="report-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ["UPLOAD_DIR"] = os.path.join(_WORKDIR, "uploads")
+os.environ["IMAGES_DIR"] = os.path.join(_WORKDIR, "uploads", "images")
+os.environ["OUTPUT_DIR"] = os.path.join(_WORKDIR, "output")
@@ -0,0 +1,49 @@
+from app.core.dedup import Deduplicator
+from app.core.markdown_parser import markdown_parser
+
+NO_CHANGES = "Tidak ada perubahan."
+
+FIRST = f"""## 22 Desember 2025
+{NO_CHANGES}
+
+## 23 Desember 2025
+### 1. Tambah login
+**Commit:** `abcdef1`
+
+## 24 Desember 2025
+{NO_CHANGES}
+"""
+
+SECOND = f"""## 23 Desember 2025
+### 1. Tambah login
+**Commit:** `abcdef1`
+
+## 25 Desember 2025
+### 1. Tambah login
+**Commit:** `abcdef1234567`
+
+### 2. Perbaiki logout
+**Commit:** `1234567`
+"""
+
+
+def test_sections_and_commits_repeated_across_files_are_dropped():
+    dedup = Deduplicator()
+    markdown_parser.dedupe(FIRST, dedup)
+
+    second = markdown_parser.dedupe(SECOND, dedup)
+
+    assert "## 23 Desember 2025" not in second
+    assert "abcdef1234567" not in second
+    assert "`1234567`" in second
+    assert dedup.dropped == 2
+
+
+def test_repeats_inside_one_file_are_kept():
+    dedup = Deduplicator()
+
+    first = markdown_parser.dedupe(FIRST + FIRST.replace("2025", "2026"), dedup)
+
+    assert first.count(NO_CHANGES) == 4
+    assert first.count("`abcdef1`") == 2
+    assert dedup.dropped == 0
@@ -0,0 +1,52 @@
+from datetime import date
+
+from app.core.file_manager import file_manager
+from app.core.markdown_parser import markdown_parser
+
+REPORT = """# Laporan ünïcode\r
+intro
+
+## 22 Desember 2025\r
+
+   
+## 23 Desember 2025
+### 1. Tambah login
+**Commit:** `abcdef1234`
+**Author:** Ana
+kata é
+
+## 24 Desember 2025
+**Commit:** `abcdef1`
+**Author:** Budi"""
+
+
+def test_index_matches_whole_text_parse():
+    metadata = file_manager.save_content(REPORT, "report.md")
+    try:
+        file_index = file_manager.get_index(metadata.file_id, metadata.file_path)
+        text = markdown_parser.index_sections(REPORT)
+        expected = [
+            [section.date.date().isoformat(), len(REPORT[:section.start].encode()),
+             len(text.section_text(section).encode()) + len(REPORT[:section.start].encode())]
+            for section in text.sections
+        ]
+
+        assert file_index["sections"] == expected
+        for start, end in ((date(2025, 12, 22), date(2025, 12, 23)), (date(2025, 12, 24), date(2025, 12, 24))):
+            assert file_manager.read_date_range(metadata.file_id, start, end) == (
+                markdown_parser.select_date_range(REPORT, start, end)
+            )
+    finally:
+        file_manager.delete_file(metadata.file_id)
+
+
+def test_stats_collected_in_the_same_pass():
+    metadata = file_manager.save_content(REPORT, "report.md")
+    try:
+        stats = metadata.stats
+        assert stats.commits == 1  # Same short hash twice
+        assert stats.authors == ["Ana", "Budi"]
+        assert (stats.first_date, stats.last_date, stats.date_sections) == ("2025-12-22", "2025-12-24", 3)
+        assert stats.words == len(REPORT.split())
+    finally:
+        file_manager.delete_file(metadata.file_id)
@@ -0,0 +1,52 @@
+from datetime import date
+
+from app.core.gitlog_parser import gitlog_parser
+from app.core.markdown_parser import markdown_parser
+
+GIT_LOG = """commit 1111111aaaaaaa
+Author: Ana <ana@example.com>
+Date:   Mon Dec 22 09:00:00 2025 +0700
+
+    feat: add login page
+
+commit 2222222bbbbbbb
+Author: Budi <budi@example.com>
+Date:   Tue Dec 23 10:00:00 2025 +0700
+
+    fix: crash on logout
+
+commit 3333333ccccccc
+Author: Ana <ana@example.com>
+Date:   Wed Dec 24 11:00:00 2025 +0700
+
+    feat: add profile page
+"""
+
+
+def test_convert_counts_only_commits_in_range():
+    markdown = gitlog_parser.convert(GIT_LOG.split("\n"), date(2025, 12, 23), date(2025, 12, 24))
+
+    assert "## 22 Desember 2025" not in markdown
+    assert "Periode ini mencakup 2 commit dalam 2 hari oleh Ana, Budi." in markdown
+    assert "| Total Commits | 2 |" in markdown
+    assert "Add login page" not in markdown
+
+
+def test_prepare_date_range_keeps_summary_of_git_logs():
+    markdown = markdown_parser.prepare_date_range(GIT_LOG, date(2025, 12, 22), date(2025, 12, 22))
+
+    assert "## Ringkasan Perubahan" in markdown
+    assert "| Total Commits | 1 |" in markdown
+    assert markdown_parser.prepare_date_range(GIT_LOG, date(2026, 1, 1), date(2026, 1, 2)) is None
+
+
+def test_group_by_day_leaves_commits_untouched():
+    commits = gitlog_parser.parse(GIT_LOG.replace("Wed Dec 24 11:00:00 2025 +0700", "Tue Dec 23 20:30:00 2025 +0000"))
+    original = [commit.date for commit in commits]
+
+    days = gitlog_parser.group_by_day(commits)
+
+    assert [commit.date for commit in commits] == original
+    assert days[-1][0] == date(2025, 12, 24)
+    assert days[-1][1][0].date.hour == 3
+    assert gitlog_parser.days_to_markdown(days) == gitlog_parser.to_markdown(commits)
@@ -0,0 +1,45 @@
+import markdown
+
+from app.core.highlight import highlight_cache
+from app.core.markdown_parser import create_markdown
+
+DOCUMENT = """## 22 Desember 2025
+
+```python
+def total(items):
+    return sum(item.price for item in items)
+```
+
+```python hl_lines="2"
+import os
+print(os.getcwd())
+```
+"""
+
+EXTENSIONS = ["tables", "fenced_code", "codehilite", "toc", "meta", "nl2br", "sane_lists", "attr_list"]
+CONFIGS = {
+    "codehilite": {"css_class": "highlight", "linenums": False, "guess_lang": True},
+    "toc": {"permalink": False, "toc_depth": 3},
+}
+
+
+def test_repeated_fenced_block_hits_the_html_cache():
+    create_markdown().convert(DOCUMENT)
+    hits = highlight_cache.hits
+
+    create_markdown().convert(DOCUMENT)
+
+    assert highlight_cache.hits >= hits + 2
+
+
+def test_fenced_blocks_match_plain_fenced_code():
+    expected = markdown.Markdown(extensions=EXTENSIONS, extension_configs=CONFIGS).convert(DOCUMENT)
+
+    assert create_markdown().convert(DOCUMENT) == expected
+
+
+def test_attr_fences_are_left_to_fenced_code():
+    document = "```{.python .numbered}\nx = 1\n```\n"
+    expected = markdown.Markdown(extensions=EXTENSIONS, extension_configs=CONFIGS).convert(document)
+
+    assert create_markdown().convert(document) == expected
@@ -0,0 +1,70 @@
+import pytest
+
+from app.core.markdown_parser import CombineMode, markdown_parser
+
+# File A defines the link, file B uses it in an earlier date section
+FILE_A = """# Report A
+
+## 22 Desember 2025
+
+See the [guide][d] and [the wiki].
+
+[d]: https://example.com/docs "Docs"
+[the wiki]: https://example.com/wiki
+
+```
+[fake]: https://example.com/not-a-definition
+```
+"""
+
+FILE_B = """# Report B
+
+## 15 Desember 2025
+
+Read [docs][d], [the wiki] and [fake].
+
+## 29 Desember 2025
+
+Plain section.
+"""
+
+
+def _whole_document(contents, filenames, mode):
+    return markdown_parser.parse(
+        markdown_parser.sort_by_date(markdown_parser.combine_contents(contents, filenames, mode))
+    )
+
+
+@pytest.mark.parametrize("mode", [CombineMode.SEQUENTIAL, CombineMode.SECTIONED])
+def test_parse_combined_resolves_links_across_sections(mode):
+    contents, filenames = [FILE_A, FILE_B], ["a.md", "b.md"]
+    expected = _whole_document(contents, filenames, mode)
+
+    parsed = markdown_parser.parse_combined(contents, filenames, mode)
+
+    assert 'href="https://example.com/docs"' in expected.html
+    assert parsed.html == expected.html
+    assert parsed.toc == expected.toc
+
+
+@pytest.mark.parametrize("mode", [CombineMode.SEQUENTIAL, CombineMode.SECTIONED])
+def test_parse_files_resolves_links_across_sections(tmp_path, mode):
+    paths = []
+    for name, content in (("a.md", FILE_A), ("b.md", FILE_B)):
+        path = tmp_path / name
+        path.write_text(content, encoding="utf-8")
+        paths.append(path)
+    expected = _whole_document([FILE_A, FILE_B], ["a.md", "b.md"], mode)
+
+    parsed = markdown_parser.parse_files(paths, mode, max_memory=64)
+
+    assert parsed.html == expected.html
+    assert parsed.toc == expected.toc
+
+
+def test_link_definitions_skip_fenced_code_and_keep_the_last():
+    definitions = markdown_parser.link_definitions([FILE_A, "[D]: https://example.com/v2"])
+
+    assert "[fake]" not in definitions
+    assert "https://example.com/docs" not in definitions
+    assert "[D]: https://example.com/v2" in definitions
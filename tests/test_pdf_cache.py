@@ -0,0 +1,22 @@
+from app.core.pdf_cache import PDFCache
+
+
+def test_link_outlives_eviction_of_the_entry(tmp_path):
+    cache = PDFCache(tmp_path / "cache", max_size=1, enabled=True)
+    entry = cache.put_bytes("a" * 64, b"%PDF-first")
+    served = cache.link_to(cache.get("a" * 64), tmp_path / "served.pdf")
+
+    cache.put_bytes("b" * 64, b"%PDF-second")  # Evicts the first entry
+
+    assert not entry.exists()
+    assert served.read_bytes() == b"%PDF-first"
+
+
+def test_clear_keeps_renders_being_stored(tmp_path):
+    cache = PDFCache(tmp_path / "cache", enabled=True)
+    cache.put_bytes("a" * 64, b"%PDF")
+    in_flight = cache.temp_path()
+    in_flight.write_bytes(b"%PDF-partial")
+
+    assert cache.clear() == 1
+    assert in_flight.exists()
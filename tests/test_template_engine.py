@@ -0,0 +1,35 @@
+import time
+
+from app.core.template_engine import TemplateEngine
+
+
+def _engines(tmp_path, check_seconds):
+    template_dir = tmp_path / "templates"
+    template_dir.mkdir()
+    (template_dir / "report.html").write_text("v1 {{ report_title }}", encoding="utf-8")
+    generation = tmp_path / "generation"
+    return template_dir, [
+        TemplateEngine(template_dir, None, False, generation, check_seconds) for _ in range(2)
+    ]
+
+
+def test_reload_in_one_worker_reaches_the_other(tmp_path):
+    template_dir, (first, second) = _engines(tmp_path, 0.05)
+    assert second.render_report("report.html", "") == "v1 Weekly Work Report"
+
+    (template_dir / "report.html").write_text("v2 {{ report_title }}", encoding="utf-8")
+    first.reload()
+    assert first.render_report("report.html", "") == "v2 Weekly Work Report"
+
+    time.sleep(0.06)
+    assert second.render_report("report.html", "") == "v2 Weekly Work Report"
+
+
+def test_generation_is_not_checked_on_every_render(tmp_path):
+    template_dir, (first, second) = _engines(tmp_path, 60)
+    second.render_report("report.html", "")
+
+    (template_dir / "report.html").write_text("v2 {{ report_title }}", encoding="utf-8")
+    first.reload()
+
+    assert second.render_report("report.html", "") == "v1 Weekly Work Report"